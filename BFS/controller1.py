@@ -1,153 +1,158 @@
+import os
+import sys
+
+# The engine package shared by all the algorithms lives one folder up.
+ENGINE_PARENT = os.path.join(
+	os.path.dirname(os.path.abspath(__file__)), os.pardir
+)
+if ENGINE_PARENT not in sys.path:
+	sys.path.append(ENGINE_PARENT)
+
+from engine.board import getBoard
+from engine.corridor import CorridorPolicy
+from engine.distance import distanceFieldSearch
+from engine.frontier import BUCKET_FRONTIER
+from engine.parallel import searchMusketeers
+from engine.region import pruneBoard
+from engine.search import (
+	FifoPolicy, FValuePolicy, bidirectionalBfsSearch, getMusketeerPositions,
+	graphSearch, orderMusketeers, searchEachMusketeer
+)
+from engine.trace import (
+	TRACE_FULL, getNoPathResult, getSearchResult, getTraceLevel
+)
 
 EMPTY = 0
 MUSKEETER = 1
 SOLDIER = 2
 DIAMOND = 3
 
-def singleAgentSearch(board):
+def singleAgentSearch(board, multiSource=False, trace=TRACE_FULL,
+					  bidirectional=False, parallel=False, corridors=False,
+					  prune=False, distanceField=False):
 	""" Wrapper function for bfsSearch which calls bfsSearch for 
 	each musketeer on the board and keeps track of the one which
 	finds the diamond in shortest number of steps.
 
-	:param board: The square game board which is a 2d list of integers.
+	:param board: The game board which is a 2d list of integers, or a
+		Board like the ones engine.board.loadBoard reads.
+	:param multiSource: If True, search from all the musketeers at once
+		in a single traversal instead of running one search per musketeer.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:param bidirectional: If True, search from all the musketeers and
+		from the diamond at once, see engine.search.bidirectionalBfsSearch.
+	:param parallel: If True, run the search from every musketeer in its
+		own worker process with engine.parallel.searchMusketeers, which
+		returns the same result and stops once the shortest path is known.
+	:param corridors: If True, run Dijkstra's algorithm over the corridor
+		graph of the board, which contracts every corridor into a single
+		weighted edge, see engine.corridor.
+	:param prune: If True, skip the musketeers which can't reach a diamond
+		and search a copy of the board without the cells no path to a
+		diamond goes through, see engine.region.
+	:param distanceField: If True, walk down the distance field of the
+		board instead of searching, which only costs a bfs the first time
+		a board is queried, see engine.distance.distanceFieldSearch.
 	:returns: A tuple containing exploredNodes, searchQueue and the shortestPath
 	corresponding to the musketeer which finds the diamond in the shortest 
-	number of steps.
+	number of steps, or only the shortestPath and its length with TRACE_NONE.
+	:raises ValueError: If more than one of bidirectional, corridors and
+		distanceField are asked for.
 
 	"""
-	exploredNodes = []
-	searchQueue   = []
-	shortestPath  = []
+	if bidirectional + corridors + distanceField > 1:
+		raise ValueError(
+			'bidirectional, corridors and distanceField can not be combined'
+		)
+	trace = getTraceLevel(trace)
+	board = getBoard(board)
 
 	musketeerPositions = getMusketeerPositions(board)
 	if len(musketeerPositions) == 0:
 		print "Where are my musketeers? How do I play? ANSWER ME!"
 		return
 
-	for i in range(len(musketeerPositions)):
-		(newExploredNodes, newSearchQueue, newShortestPath) = \
-			bfsSearch(board, musketeerPositions[i])
-
-		if  shortestPath == [] \
-		or  (len(newShortestPath) < len(shortestPath) \
-		and len(newShortestPath) > 0):
-			(exploredNodes, searchQueue, shortestPath) = \
-				(newExploredNodes, newSearchQueue, newShortestPath)
-
-	return (exploredNodes,searchQueue,shortestPath)
-
-def bfsSearch(board, musketeerPosition):
+	if prune:
+		(board, musketeerPositions) = pruneBoard(board, musketeerPositions)
+		if len(musketeerPositions) == 0:
+			return getNoPathResult(trace)
+
+	if distanceField:
+		return distanceFieldSearch(board, musketeerPositions, trace)
+	if bidirectional:
+		return bidirectionalBfsSearch(board, musketeerPositions, trace)
+
+	if multiSource:
+		return multiSourceBfsSearch(board, musketeerPositions, trace,
+									corridors=corridors)
+
+	lowerBounds = orderMusketeers(board, musketeerPositions,
+								  board.findCells(DIAMOND))
+	if parallel:
+		return searchMusketeers(bfsSearch, board, musketeerPositions,
+								lowerBounds, (trace, corridors))
+	return searchEachMusketeer(bfsSearch, board, musketeerPositions,
+							   (trace, corridors))
+
+def bfsSearch(board, musketeerPosition, trace=TRACE_FULL, corridors=False,
+			  upperBound=None):
 	""" Perform a bfs search on the game board.
 
-	:param board: The game board.
-	:param musketeerPosition: The [row, col] of musketeer on the board.
-	:returns: A tuple containing exploredNodes, searchQueue, shortestPath.
-
-	"""
-	totalRows = totalColumns = len(board)
-	exploredNodes, searchQueue, iterativeSearchQueue, shortestPath = [],[],[],[]
-	# List of nodes visited and the position from which they were visited.
-	# Used for calculating shortest path.
-	visited = [[False for i in range(totalRows)] for i in range(totalColumns)]
-	goalFound = False
-
-	searchQueue.append(musketeerPosition)
-	while len(searchQueue) != 0:
-		[x, y] = searchQueue[0]
-		exploredNodes.append([x, y])
-		del searchQueue[0] # Pop
-		if board[x][y] == DIAMOND:
-			# Diamong found! Append the remaining queue as part of this
-			# iteration and break.
-			goalFound = True
-			iterativeSearchQueue.append(searchQueue[:])
-			break
-		neighbours = []
-		if y != 0: # Left
-			if hasSoldierOrDiamond(board[x][y-1]) and visited[x][y-1] == False:
-				neighbours.append([x, y-1])
-				visited[x][y-1] = [x, y]
-		if x != totalRows - 1: # Down
-			if hasSoldierOrDiamond(board[x+1][y]) and visited[x+1][y] == False:
-				neighbours.append([x+1, y])
-				visited[x+1][y] = [x, y]
-		if y != totalColumns - 1: # Right
-			if hasSoldierOrDiamond(board[x][y+1]) and visited[x][y+1] == False:
-				neighbours.append([x, y+1])
-				visited[x][y+1] = [x, y]
-		if x != 0: # Up
-			if hasSoldierOrDiamond(board[x-1][y]) and visited[x-1][y] == False:
-				neighbours.append([x-1, y])
-				visited[x-1][y] = [x,y]
-
-		searchQueue.extend(neighbours)
-		iterativeSearchQueue.append(searchQueue[:])
-
-	if goalFound:
-		shortestPath = getShortestPath(visited, musketeerPosition, [x, y])
-		b = getShortestPathRecursive(visited, musketeerPosition, [x, y])
-
-	return (exploredNodes, iterativeSearchQueue, shortestPath)
-
-def getShortestPath(visited,  musketeerPosition, diamondPosition):
-	""" Return shortest path from diamondPosition to musketeerPosition.
-	We essentially backtrace from diamondPosition to musketeerPosition
-	using the visited list.
-
-	:param visited: The visited 2d list
+	:param board: The game board, a Board or a 2d list of integers.
 	:param musketeerPosition: The [row, col] of musketeer on the board.
-	:param diamondPosition: The [row, col] of the found diamond on the board. 
-	:returns: A list containing the shortest path from musketeer's position
-		to diamond's position.
-
-	-- note::
-		This should only be called if diamond is found else it might get stuck
-		for time and beyond.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:param corridors: If True, run Dijkstra's algorithm over the corridor
+		graph of the board, which contracts every corridor into a single
+		weighted edge, see engine.corridor.
+	:param upperBound: Only look for paths of fewer moves than this, or
+		for any path if None. Nodes whose g value reaches it are pruned.
+	:returns: A tuple containing exploredNodes, searchQueue, shortestPath,
+		or shortestPath and its length with TRACE_NONE.
 
 	"""
-	shortestPath = []
-	[x, y] = diamondPosition
-	shortestPath.append([x, y])
-	while [x, y] != musketeerPosition:
-		[x, y] = visited[x][y]
-		shortestPath.append([x, y])
-
-	# Since we backtrace from the diamond's position to muskeeter position,
-	# we need to reverse the list to return the path from muskeeter to diamond.
-	return shortestPath[::-1]
-
-def getShortestPathRecursive(visited, musketeerPosition, diamondPosition):
-	""" Recursive version of getShortestPath.
-
-	:param visited: The visited 2d list
-	:param musketeerPosition: The [row, col] of musketeer on the board.
-	:param diamondPosition: The [row, col] of the found diamond on the board. 
-	:returns: A list containing the shortest path from musketeer's position
-		to diamond's position.
-
-	-- note::
-		This should only be called if diamond is found else it will get
-		stuck and only stop in the year 3052 which as we all know, is doomsday. 
-		Stopping this function would be the least of your worries by then. 
-		Hopefully.
+	return multiSourceBfsSearch(board, [musketeerPosition], trace, upperBound,
+								corridors)
+
+def multiSourceBfsSearch(board, musketeerPositions, trace=TRACE_FULL,
+						 upperBound=None, corridors=False):
+	""" Perform a bfs search on the game board starting from all the
+	given musketeers at once.
+
+	Every musketeer is seeded into the queue before the search starts, so
+	the first time the diamond is dequeued it has been reached by the
+	musketeer closest to it. The musketeer a path originates from is
+	recovered when backtracing it.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:param musketeerPositions: A list of [row, col] of musketeers on the board.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:param upperBound: Only look for paths of fewer moves than this, or
+		for any path if None. Nodes whose g value reaches it are pruned.
+	:param corridors: If True, run Dijkstra's algorithm over the corridor
+		graph of the board, which contracts every corridor into a single
+		weighted edge, see engine.corridor.
+	:returns: A tuple containing exploredNodes, searchQueue, shortestPath.
+		searchQueue is a SearchTrace of the queue in every iteration. With
+		TRACE_NONE only shortestPath and its length are returned.
 
 	"""
-	[x, y] = diamondPosition
-	if [x, y] == musketeerPosition:
-		return [[x, y]]
-	b = getShortestPathRecursive(visited, musketeerPosition, visited[x][y])
-	return b + [[x, y]]
-
-def getMusketeerPositions(board):
-	positions = []
-	for i in range(len(board)):
-		for j in range(len(board[i])):
-			if board[i][j] == 1:
-				positions.append([i,j])
-	return positions
-
-def hasSoldierOrDiamond(thing):
-	return (thing == SOLDIER or thing == DIAMOND)
+	trace = getTraceLevel(trace)
+	board = getBoard(board)
+	policy = FifoPolicy(upperBound)
+	if corridors:
+		# Edges are no longer a single move each, so nodes are taken in
+		# order of their g value rather than of when they were reached.
+		policy = CorridorPolicy(
+			FValuePolicy(None, BUCKET_FRONTIER, upperBound)
+		)
+	(exploredNodes, searchQueue, shortestPath) = graphSearch(
+		board, [board.getCell(position) for position in musketeerPositions],
+		policy, trace
+	)
+	return getSearchResult(trace, exploredNodes, searchQueue, shortestPath)
 
 # board = [
 # 			[0, 2, 2, 2, 1],
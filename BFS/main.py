@@ -1,6 +1,20 @@
-import view
-try:
-            view.main()
-except:
-            print('Invalid List Format')
-            view.terminate()
+import sys
+
+if '--headless' in sys.argv[1:]:
+            # Search input.txt without the view, so pygame is never loaded.
+            import controller1
+            from engine.board import loadBoard
+            from engine.solver import formatPath
+            from engine.trace import TRACE_NONE
+            result = controller1.singleAgentSearch(loadBoard('input.txt'),
+                                                   trace=TRACE_NONE)
+            if result is not None:
+                        (shortestPath, moves) = result
+                        print('%d\t%s' % (moves, formatPath(shortestPath)))
+else:
+            import view
+            try:
+                        view.main()
+            except:
+                        print('Invalid List Format')
+                        view.terminate()
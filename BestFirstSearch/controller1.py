@@ -1,43 +1,57 @@
-import heapq
+import os
+import sys
+
+# The engine package shared by all the algorithms lives one folder up.
+ENGINE_PARENT = os.path.join(
+	os.path.dirname(os.path.abspath(__file__)), os.pardir
+)
+if ENGINE_PARENT not in sys.path:
+	sys.path.append(ENGINE_PARENT)
+
+from engine.board import getBoard
+from engine.frontier import ORDERED_FRONTIER
+from engine.jump import JumpPointPolicy
+from engine.region import pruneBoard
+from engine.search import (
+	HeuristicPolicy, getMusketeerAndDiamondPositions, graphSearch,
+	orderMusketeers, searchEachMusketeer
+)
+from engine.trace import (
+	TRACE_FULL, getNoPathResult, getSearchResult, getTraceLevel
+)
 
 EMPTY = 0
 MUSKEETER = 1
 SOLDIER = 2
 DIAMOND = 3
 
-class Node(object):
-	""" Represent a node on the game board.
-	"""
-	def __init__(self, position, val):
-		""" Initalize a node.
-
-		:param position: [row, col] describing a position on the board.
-		:param val: Heuristic value from the position to goal.
-
-		"""
-		super(Node, self).__init__()
-		self.position = position
-		self.val = val
-
-	def __cmp__(self, other):
-		""" Method used by heapq to insert values into heap.
-		"""
-		return cmp(self.val, other.val)
-
-def singleAgentSearch(board):
+def singleAgentSearch(board, multiSource=False, trace=TRACE_FULL,
+					  frontier=ORDERED_FRONTIER, jump=False, prune=False):
 	""" Wrapper method for bestFirstSearch which calls bestFirstSearch for 
 	each musketeer on the board and keeps track of the one which
 	finds the diamond in shortest number of steps.
 
-	:param board: The square game board which is a 2d list of integers.
+	:param board: The game board which is a 2d list of integers, or a
+		Board like the ones engine.board.loadBoard reads.
+	:param multiSource: If True, search from all the musketeers at once
+		in a single traversal instead of running one search per musketeer.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:param frontier: The kind of priority queue to order the search on,
+		one of the *_FRONTIER kinds of engine.frontier.
+	:param jump: If True, run jump point search, which only pushes the
+		cells where a shortest path may turn, see engine.jump.
+	:param prune: If True, skip the musketeers which can't reach a diamond
+		and search a copy of the board without the cells no path to a
+		diamond goes through, see engine.region.
 	:returns: A tuple containing exploredNodes, searchQueue and the shortestPath
 		corresponding to the musketeer which finds the diamond in the shortest 
-		number of steps.
+		number of steps, or only the shortestPath and its length with
+		TRACE_NONE.
 
 	"""
-	exploredNodes = []
-	searchQueue  = []
-	shortestPath = []
+	trace = getTraceLevel(trace)
+	board = getBoard(board)
 
 	(musketeerPositions, diamondPosition) = getMusketeerAndDiamondPositions(board)
 	if len(musketeerPositions) == 0:
@@ -46,180 +60,82 @@ def singleAgentSearch(board):
 	if len(diamondPosition) == 0:
 		raise DiamondNotFound
 
-	for i in range(len(musketeerPositions)):
-		(newExploredNodes, newSearchQueue, newShortestPath) = \
-			bestFirstSearch(board, musketeerPositions[i], diamondPosition)
+	if prune:
+		(board, musketeerPositions) = pruneBoard(board, musketeerPositions)
+		if len(musketeerPositions) == 0:
+			return getNoPathResult(trace)
 
-		if  shortestPath == [] \
-		or  (
-				len(newShortestPath) < len(shortestPath) \
-				and len(newShortestPath) > 0
-			):
-			(exploredNodes, searchQueue, shortestPath) = \
-				(newExploredNodes, newSearchQueue, newShortestPath)
+	if multiSource:
+		return multiSourceBestFirstSearch(board, musketeerPositions,
+										  diamondPosition, trace, frontier,
+										  jump=jump)
 
-	return (exploredNodes,searchQueue,shortestPath)
+	orderMusketeers(board, musketeerPositions, [board.getCell(diamondPosition)])
+	return searchEachMusketeer(bestFirstSearch, board, musketeerPositions,
+							   (diamondPosition, trace, frontier, jump))
 
-def bestFirstSearch(board, musketeerPosition, diamondPosition):
+def bestFirstSearch(board, musketeerPosition, diamondPosition,
+					trace=TRACE_FULL, frontier=ORDERED_FRONTIER, jump=False,
+					upperBound=None):
 	""" Perform a best first search on the game board.
 
-	:param board: The game board.
+	:param board: The game board, a Board or a 2d list of integers.
 	:param musketeerPosition: The [row, col] of musketeer on the board.
 	:param diamondPosition: The [row, col] of diamond on the board.
-	:returns: A tuple containing exploredNodes, searchQueue, shortestPath.
-
-	"""
-	totalRows = totalColumns = len(board)
-	exploredNodes, searchQueue, iterativeSearchQueue, shortestPath = [],[],[],[]
-	# List of nodes visited and the position from which they were visited.
-	# Used for calculating shortest path.
-	visited = [[False for i in range(totalRows)] for i in range(totalColumns)]
-	goalFound = False
-
-	musketeerNode = Node(
-		musketeerPosition,
-		getHeuristicValue(musketeerPosition, diamondPosition)
-	)
-	heapq.heappush(searchQueue, musketeerNode)
-	while len(searchQueue) != 0:
-		[row, col] = heapq.heappop(searchQueue).position
-		exploredNodes.append([row, col])
-		if board[row][col] == DIAMOND:
-			# Diamong found! Append the remaining queue as part of this
-			# iteration and break.
-			goalFound = True
-			iterativeSearchQueue.append(getSortedQueue(searchQueue))
-			break
-		# Add all unvisited paths to heap queue.
-		paths = numberOfPaths(board, [row, col], visited)
-		for path in paths:
-			heuristicVal = getHeuristicValue(path, diamondPosition)
-			heapq.heappush(searchQueue, Node(path, heuristicVal))
-			visited[path[0]][path[1]] = [row, col]
-
-		iterativeSearchQueue.append(getSortedQueue(searchQueue))
-	if goalFound:
-		shortestPath = getShortestPath( visited,
-										musketeerPosition, 
-										diamondPosition)
-	return (exploredNodes, iterativeSearchQueue, shortestPath)
-
-def getSortedQueue(queue):
-	""" Return the heap queue as a sorted list.
-
-	:param queue: The heap queue.
-	:return: A list of positions in the queue sorted on their heuristic value.
-
-	-- note::
-		This method uses a hack presently to get a list of sorted values
-		from the heap queue which isn't necessarly optimal. It essentially
-		fetches the n smallest element from the queue where n is the
-		length of the queue.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:param frontier: The kind of priority queue to order the search on,
+		one of the *_FRONTIER kinds of engine.frontier.
+	:param jump: If True, run jump point search, which only pushes the
+		cells where a shortest path may turn, see engine.jump.
+	:param upperBound: Only look for paths of fewer moves than this, or
+		for any path if None. Nodes whose f value reaches it are pruned.
+	:returns: A tuple containing exploredNodes, searchQueue, shortestPath,
+		or shortestPath and its length with TRACE_NONE.
 
 	"""
-	sortedNodeQueue = heapq.nsmallest(len(queue), queue)
-	sortedQueue = [node.position for node in sortedNodeQueue]
-	return sortedQueue
-
-def getHeuristicValue(position, diamondPosition):
-	""" Return the heuristic value of a position.
-
-	:param position: The position whose heuristic value is to be calculated.
-	:param diamondPosition: The position of the diamond on the board.
-	:return: The heuristic value of the position.
+	return multiSourceBestFirstSearch(board, [musketeerPosition],
+									  diamondPosition, trace, frontier,
+									  upperBound, jump)
+
+def multiSourceBestFirstSearch(board, musketeerPositions, diamondPosition,
+							   trace=TRACE_FULL, frontier=ORDERED_FRONTIER,
+							   upperBound=None, jump=False):
+	""" Perform a best first search on the game board starting from all
+	the given musketeers at once.
+
+	Every musketeer is pushed onto the queue before the search starts and
+	the search stops at the first diamond hit. Like the single musketeer
+	search, the path found isn't necessarily the shortest one. The musketeer
+	a path originates from is recovered when backtracing it.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:param musketeerPositions: A list of [row, col] of musketeers on the board.
+	:param diamondPosition: The [row, col] of diamond on the board.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:param frontier: The kind of priority queue to order the search on,
+		one of the *_FRONTIER kinds of engine.frontier.
+	:param upperBound: Only look for paths of fewer moves than this, or
+		for any path if None. Nodes whose f value reaches it are pruned.
+	:param jump: If True, run jump point search, which only pushes the
+		cells where a shortest path may turn, see engine.jump.
+	:returns: A tuple containing exploredNodes, searchQueue, shortestPath.
+		searchQueue is a SearchTrace of the queue in every iteration. With
+		TRACE_NONE only shortestPath and its length are returned.
 
 	"""
-	return (
-		abs(position[0] - diamondPosition[0]) + 
-		abs(position[1] - diamondPosition[1])
+	trace = getTraceLevel(trace)
+	board = getBoard(board)
+	policy = HeuristicPolicy(board.getCell(diamondPosition), frontier,
+							 upperBound)
+	if jump:
+		policy = JumpPointPolicy(policy)
+	(exploredNodes, searchQueue, shortestPath) = graphSearch(
+		board, [board.getCell(position) for position in musketeerPositions],
+		policy, trace
 	)
-
-
-def numberOfPaths(board, pos, visited):
-	""" Return different possible paths from a given position.
-
-	Return the different possible paths that can be taken from a
-	given position excluding the one's which are already taken.
-
-	:param board: The game board.
-	:param pos: The [row, col] from which to calculate possible paths.
-	:param visited: A 2d list containing a [row, col] for indexes 
-		which are already visited describing the position they were visited
-		from and False for unvisited indexes.
-	:returns: A list containing the [row, col] of the possible direction
-		to proceed in.
-
-	"""
-	[row, col] = pos
-	totalRows = totalColumns = len(board)
-	paths = []
-	if col != 0:
-		if visited[row][col-1] == False \
-		and hasSoldierOrDiamond(board[row][col-1]):
-			paths.append([row, col-1])
-	if row != totalRows - 1:
-		if visited[row+1][col] == False \
-		and hasSoldierOrDiamond(board[row+1][col]):
-			paths.append([row + 1, col])
-	if col != totalColumns - 1:
-		if visited[row][col+1] == False \
-		and hasSoldierOrDiamond(board[row][col+1]):
-			paths.append([row, col+1])
-	if row != 0:
-		if visited[row-1][col] == False \
-		and hasSoldierOrDiamond(board[row-1][col]):
-			paths.append([row-1, col])
-	return paths
-
-def getMusketeerAndDiamondPositions(board):
-	""" Return the position of musketeers and diamond on the game board.
-
-	:param board: The game board.
-	:return: A tuple containing a list of muskeeter positions and [row, col]
-		for the diamond position.
-
-	"""
-	muskeeterPositions = []
-	diamondPosition = []
-	for i in range(len(board)):
-		for j in range(len(board[i])):
-			if board[i][j] == 1:
-				muskeeterPositions.append([i,j])
-			elif board[i][j] == DIAMOND:
-				diamondPosition = [i, j]
-	return (muskeeterPositions, diamondPosition)
-
-def getShortestPath(visited,  musketeerPosition, diamondPosition):
-	""" Return shortest path from diamondPosition to musketeerPosition.
-
-	This essentially backtraces from diamondPosition to musketeerPosition
-	using the visited list.
-
-	:param visited: The visited 2d list
-	:param musketeerPosition: The [row, col] of musketeer on the board.
-	:param diamondPosition: The [row, col] of the found diamond on the board. 
-	:returns: A list containing the shortest path from musketeer's position
-		to diamond's position.
-
-	-- note::
-		This should only be called if diamond is found else it might get stuck
-		for time and beyond.
-
-	"""
-	shortestPath = []
-	[x, y] = diamondPosition
-	shortestPath.append([x, y])
-	while [x, y] != musketeerPosition:
-		[x, y] = visited[x][y]
-		shortestPath.append([x, y])
-
-	# Since we backtrace from the diamond's position to muskeeter position,
-	# we need to reverse the list to return the path from muskeeter to diamond.
-	return shortestPath[::-1]
-
-def hasSoldierOrDiamond(thing):
-	return (thing == SOLDIER or thing == DIAMOND)
-
+	return getSearchResult(trace, exploredNodes, searchQueue, shortestPath)
 
 class MusketeerNotFound(Exception):
     pass
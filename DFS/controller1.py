@@ -1,165 +1,107 @@
+import os
+import sys
+
+# The engine package shared by all the algorithms lives one folder up.
+ENGINE_PARENT = os.path.join(
+	os.path.dirname(os.path.abspath(__file__)), os.pardir
+)
+if ENGINE_PARENT not in sys.path:
+	sys.path.append(ENGINE_PARENT)
+
+from engine.board import getBoard
+from engine.region import pruneBoard
+from engine.search import (
+	LifoPolicy, getMusketeerPositions, graphSearch, searchEachMusketeer
+)
+from engine.trace import (
+	TRACE_FULL, getNoPathResult, getSearchResult, getTraceLevel
+)
 
 EMPTY = 0
 MUSKEETER = 1
 SOLDIER = 2
 DIAMOND = 3
 
-def singleAgentSearch(board):
+def singleAgentSearch(board, multiSource=False, trace=TRACE_FULL,
+					  prune=False):
 	""" Wrapper function for dfsSearch which calls dfsSearch for 
 	each musketeer on the board and keeps track of the one which
 	finds the diamond in shortest number of steps.
 
-	:param board: The square game board which is a 2d list of integers.
+	:param board: The game board which is a 2d list of integers, or a
+		Board like the ones engine.board.loadBoard reads.
+	:param multiSource: If True, search from all the musketeers at once
+		in a single traversal instead of running one search per musketeer.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:param prune: If True, skip the musketeers which can't reach a diamond
+		and search a copy of the board without the cells no path to a
+		diamond goes through, see engine.region.
 	:returns: A tuple containing exploredNodes, searchQueue and the shortestPath
 	corresponding to the musketeer which finds the diamond in the shortest 
-	number of steps.
+	number of steps, or only the shortestPath and its length with
+	TRACE_NONE.
 
 	"""
-	exploredNodes = []
-	searchQueue  = []
-	shortestPath = []
+	trace = getTraceLevel(trace)
+	board = getBoard(board)
 
 	musketeerPositions = getMusketeerPositions(board)
 	if len(musketeerPositions) == 0:
 		print "Where are my musketeers? How do I play? ANSWER ME!"
 		return
 
-	# (exploredNodes, searchQueue, shortestPath) = \
-	# 	dfsSearch(board, musketeerPositions[0])
-	for i in range(len(musketeerPositions)):
-		(newExploredNodes, newSearchQueue, newShortestPath) = \
-			dfsSearch(board, musketeerPositions[i])
+	if prune:
+		(board, musketeerPositions) = pruneBoard(board, musketeerPositions)
+		if len(musketeerPositions) == 0:
+			return getNoPathResult(trace)
 
-		if  shortestPath == [] \
-		or  (
-				len(newShortestPath) < len(shortestPath) \
-				and len(newShortestPath) > 0
-			):
-			(exploredNodes, searchQueue, shortestPath) = \
-				(newExploredNodes, newSearchQueue, newShortestPath)
+	if multiSource:
+		return multiSourceDfsSearch(board, musketeerPositions, trace)
 
-	return (exploredNodes,searchQueue,shortestPath)
+	# The paths dfs finds aren't the shortest, so every search runs
+	# unbounded.
+	return searchEachMusketeer(dfsSearch, board, musketeerPositions, (trace,),
+							   bounded=False)
 
-def dfsSearch(board, musketeerPosition):
+def dfsSearch(board, musketeerPosition, trace=TRACE_FULL):
 	""" Perform a dfs search on the game board.
 
-	:param board: The game board.
+	:param board: The game board, a Board or a 2d list of integers.
 	:param musketeerPosition: The [row, col] of musketeer on the board.
-	:returns: A tuple containing exploredNodes, searchQueue, shortestPath.
-
-	"""
-	totalRows = totalColumns = len(board)
-	exploredNodes, searchQueue, iterativeSearchQueue, shortestPath = [],[],[],[]
-	# List of nodes visited and the position from which they were visited.
-	# Used for calculating shortest path.
-	visited = [[False for i in range(totalRows)] for i in range(totalColumns)]
-	goalFound = False
-
-	searchQueue.append(musketeerPosition)
-	while len(searchQueue) != 0:
-		[row, col] = searchQueue[0]
-		exploredNodes.append([row, col])
-		# Since we can end up adding a node to the queue multiple times,
-		# we should remove all occurrences of the node as soon as it
-		# is explored.
-		searchQueue = [x for x in searchQueue if x != [row, col]]
-		if board[row][col] == DIAMOND:
-			# Diamong found! Append the remaining queue as part of this
-			# iteration and break.
-			goalFound = True
-			iterativeSearchQueue.append(searchQueue[:])
-			break
-		neighbours = []
-		if col != 0: # Left
-			if (hasSoldierOrDiamond(board[row][col-1]) 
-			and [row, col-1] not in exploredNodes):
-				neighbours.append([row, col-1])
-				visited[row][col-1] = [row, col]
-		if row != totalRows - 1: # Down
-			if (hasSoldierOrDiamond(board[row+1][col]) 
-			and [row+1, col] not in exploredNodes):
-				neighbours.append([row+1, col])
-				visited[row+1][col] = [row, col]
-		if col != totalColumns - 1: # Right
-			if (hasSoldierOrDiamond(board[row][col+1]) 
-			and [row, col+1] not in exploredNodes):
-				neighbours.append([row, col+1])
-				visited[row][col+1] = [row, col]
-		if row != 0: # Up
-			if (hasSoldierOrDiamond(board[row-1][col]) 
-			and [row-1, col] not in exploredNodes):
-				neighbours.append([row-1, col])
-				visited[row-1][col] = [row,col]
-
-		# Append to the front of the queue
-		searchQueue = neighbours + searchQueue
-		iterativeSearchQueue.append(searchQueue[:])
-
-	if goalFound:
-		shortestPath = getShortestPath(visited, musketeerPosition, [row, col])
-		b = getShortestPathRecursive(visited, musketeerPosition, [row, col])
-
-	return (exploredNodes, iterativeSearchQueue, shortestPath)
-
-def getShortestPath(visited,  musketeerPosition, diamondPosition):
-	""" Return shortest path from diamondPosition to musketeerPosition.
-	We essentially backtrace from diamondPosition to musketeerPosition
-	using the visited list.
-
-	:param visited: The visited 2d list
-	:param musketeerPosition: The [row, col] of musketeer on the board.
-	:param diamondPosition: The [row, col] of the found diamond on the board. 
-	:returns: A list containing the shortest path from musketeer's position
-		to diamond's position.
-
-	-- note::
-		This should only be called if diamond is found else it might get stuck
-		for time and beyond.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:returns: A tuple containing exploredNodes, searchQueue, shortestPath,
+		or shortestPath and its length with TRACE_NONE.
 
 	"""
-	shortestPath = []
-	[x, y] = diamondPosition
-	shortestPath.append([x, y])
-	while [x, y] != musketeerPosition:
-		[x, y] = visited[x][y]
-		shortestPath.append([x, y])
-
-	# Since we backtrace from the diamond's position to muskeeter position,
-	# we need to reverse the list to return the path from muskeeter to diamond.
-	return shortestPath[::-1]
+	return multiSourceDfsSearch(board, [musketeerPosition], trace)
 
-def getShortestPathRecursive(visited, musketeerPosition, diamondPosition):
-	""" Recursive version of getShortestPath.
+def multiSourceDfsSearch(board, musketeerPositions, trace=TRACE_FULL):
+	""" Perform a dfs search on the game board starting from all the
+	given musketeers at once.
 
-	:param visited: The visited 2d list
-	:param musketeerPosition: The [row, col] of musketeer on the board.
-	:param diamondPosition: The [row, col] of the found diamond on the board. 
-	:returns: A list containing the shortest path from musketeer's position
-		to diamond's position.
+	Every musketeer is seeded into the queue before the search starts and
+	the search stops at the first diamond hit. Like the single musketeer
+	search, the path found isn't necessarily the shortest one. The musketeer
+	a path originates from is recovered when backtracing it.
 
-	-- note::
-		This should only be called if diamond is found else it will get
-		stuck and only stop in the year 3052 which as we all know, is doomsday. 
-		Stopping this function would be the least of your worries by then. 
-		Hopefully.
+	:param board: The game board, a Board or a 2d list of integers.
+	:param musketeerPositions: A list of [row, col] of musketeers on the board.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:returns: A tuple containing exploredNodes, searchQueue, shortestPath.
+		searchQueue is a SearchTrace of the queue in every iteration. With
+		TRACE_NONE only shortestPath and its length are returned.
 
 	"""
-	[x, y] = diamondPosition
-	if [x, y] == musketeerPosition:
-		return [[x, y]]
-	b = getShortestPathRecursive(visited, musketeerPosition, visited[x][y])
-	return b + [[x, y]]
-
-def getMusketeerPositions(board):
-	positions = []
-	for i in range(len(board)):
-		for j in range(len(board[i])):
-			if board[i][j] == 1:
-				positions.append([i,j])
-	return positions
-
-def hasSoldierOrDiamond(thing):
-	return (thing == SOLDIER or thing == DIAMOND)
+	trace = getTraceLevel(trace)
+	board = getBoard(board)
+	(exploredNodes, searchQueue, shortestPath) = graphSearch(
+		board, [board.getCell(position) for position in musketeerPositions],
+		LifoPolicy(), trace
+	)
+	return getSearchResult(trace, exploredNodes, searchQueue, shortestPath)
 
 # board = [
 # 			[0, 2, 2, 2, 1],
@@ -1,38 +1,70 @@
+import os
+import sys
+
+# The engine package shared by all the algorithms lives one folder up.
+ENGINE_PARENT = os.path.join(
+	os.path.dirname(os.path.abspath(__file__)), os.pardir
+)
+if ENGINE_PARENT not in sys.path:
+	sys.path.append(ENGINE_PARENT)
+
+from engine.board import getBoard
+from engine.landmark import getLandmarkTable
+from engine.parallel import searchMusketeers
+from engine.region import pruneBoard
+from engine.search import (
+	BoundedDfsPolicy, FringePolicy, getHeuristicValue,
+	getMusketeerAndDiamondPositions, graphSearch, orderMusketeers,
+	searchEachMusketeer
+)
+from engine.trace import (
+	SearchTrace, TRACE_EXPLORED, TRACE_FULL, getNoPathResult, getSearchResult,
+	getTraceLevel
+)
 
 EMPTY = 0
 MUSKEETER = 1
 SOLDIER = 2
 DIAMOND = 3
 
-class Node(object):
-	""" Represent a node on the game board.
-	"""
-	def __init__(self, position, heuristicVal, gVal):
-		""" Initalize a node.
-
-		:param position: [row, col] describing a position on the board.
-		:param heuristicVal: Heuristic value from the position to goal.
-		:param gVal: Cost from start state to this state.
-
-		"""
-		super(Node, self).__init__()
-		self.position = position
-		self.heuristicVal = heuristicVal
-		self.gVal = gVal
-		self.fVal = self.heuristicVal + self.gVal
-
-def singleAgentSearch(board):
+def singleAgentSearch(board, multiSource=False, trace=TRACE_FULL,
+					  parallel=False, statistics=None, fringe=False,
+					  prune=False, landmarks=False):
 	""" Wrapper method for idaStar which calls idaStar for 
 	each musketeer on the board and keeps track of the one which
 	finds the diamond in shortest number of steps.
 
-	:param board: The square game board which is a 2d list of integers.
+	:param board: The game board which is a 2d list of integers, or a
+		Board like the ones engine.board.loadBoard reads.
+	:param multiSource: If True, search from all the musketeers at once
+		in a single traversal instead of running one search per musketeer.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:param parallel: If True, run the search from every musketeer in its
+		own worker process with engine.parallel.searchMusketeers, which
+		returns the same result and stops once the shortest path is known.
+	:param statistics: A dict to add the counts of every search to, see
+		multiSourceIdaStar, or None.
+	:param fringe: If True, run fringeSearch instead of idaStar, which
+		finds the same shortest path without going back to the musketeers
+		every time the bound is raised.
+	:param landmarks: If True, use the landmark heuristic of the board
+		instead of the manhattan distance, see engine.landmark.
+	:param prune: If True, skip the musketeers which can't reach a diamond
+		and search a copy of the board without the cells no path to a
+		diamond goes through, see engine.region.
 	:returns: A tuple containing exploredNodes, searchQueue and the shortestPath
 		corresponding to the musketeer which finds the diamond in the shortest 
-		number of steps.
+		number of steps, or only the shortestPath and its length with
+		TRACE_NONE.
+	:raises ValueError: If statistics are asked for with parallel, as the
+		searches of the worker processes aren't counted.
 
 	"""
-	exploredNodes, searchQueue, shortestPath  = [], [], []
+	if parallel and statistics is not None:
+		raise ValueError('statistics are not collected with parallel')
+	trace = getTraceLevel(trace)
+	board = getBoard(board)
 
 	(musketeerPositions, diamondPosition) = getMusketeerAndDiamondPositions(board)
 	if len(musketeerPositions) == 0:
@@ -41,246 +73,248 @@ def singleAgentSearch(board):
 	if len(diamondPosition) == 0:
 		raise NoDiamondFound
 
-	# (exploredNodes, searchQueue, shortestPath) = \
-	# 	idaStar(board, musketeerPositions[1], diamondPosition)
-	for i in range(len(musketeerPositions)):
-		(newExploredNodes, newSearchQueue, newShortestPath) = \
-			idaStar(board, musketeerPositions[i], diamondPosition)
-
-		if  shortestPath == [] \
-		or  (
-				len(newShortestPath) < len(shortestPath) \
-				and len(newShortestPath) > 0
-			):
-			(exploredNodes, searchQueue, shortestPath) = \
-				(newExploredNodes, newSearchQueue, newShortestPath)
-
-	return (exploredNodes,searchQueue,shortestPath)
-
-def idaStar(board, musketeerPosition, diamondPosition):
+	if prune:
+		(board, musketeerPositions) = pruneBoard(board, musketeerPositions)
+		if len(musketeerPositions) == 0:
+			return getNoPathResult(trace)
+
+	if multiSource:
+		search = multiSourceFringeSearch if fringe else multiSourceIdaStar
+		return search(board, musketeerPositions, diamondPosition, trace,
+					  statistics=statistics, landmarks=landmarks)
+
+	search = fringeSearch if fringe else idaStar
+	lowerBounds = orderMusketeers(board, musketeerPositions,
+								  [board.getCell(diamondPosition)])
+	if parallel:
+		return searchMusketeers(search, board, musketeerPositions,
+								lowerBounds,
+								(diamondPosition, trace, None, landmarks))
+	return searchEachMusketeer(search, board, musketeerPositions,
+							   (diamondPosition, trace, statistics, landmarks))
+
+def idaStar(board, musketeerPosition, diamondPosition, trace=TRACE_FULL,
+			statistics=None, landmarks=False, upperBound=None):
 	""" Call idaStarIteration iteratively.
 
 	Call idaStarIteration for each iteration with a new bound and aggregate 
 	exploredNodes, searchQueue different iterations of the search.
 
-	:param board: The game board.
+	:param board: The game board, a Board or a 2d list of integers.
 	:param musketeerPosition: The [row, col] of musketeer on the board.
 	:param diamondPosition: The [row, col] of diamond on the board.
-	:returns: A tuple containing exploredNodes, searchQueue, shortestPath.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:param statistics: A dict to add the counts of the search to, see
+		multiSourceIdaStar, or None.
+	:param landmarks: If True, use the landmark heuristic of the board
+		instead of the manhattan distance, see engine.landmark.
+	:param upperBound: Only look for paths of fewer moves than this, or
+		for any path if None. Nodes whose f value reaches it are pruned.
+	:returns: A tuple containing exploredNodes, searchQueue, shortestPath,
+		or shortestPath and its length with TRACE_NONE.
 
 	"""
-	exploredNodes, searchQueue = [], []
-
-	# Use heuristic value from start node as the initial bound.
-	bound = getHeuristicValue(musketeerPosition, diamondPosition)
-
-	while True:
-		(newExploredNodes, newSearchQueue, shortestPath, nextBound) = \
-			idaStarIteration(board, musketeerPosition, diamondPosition, bound)
+	return multiSourceIdaStar(board, [musketeerPosition], diamondPosition,
+							  trace, upperBound, statistics, landmarks)
+
+def multiSourceIdaStar(board, musketeerPositions, diamondPosition,
+					   trace=TRACE_FULL, upperBound=None, statistics=None,
+					   landmarks=False):
+	""" Call idaStarIteration iteratively starting from all the given
+	musketeers at once.
+
+	Every iteration seeds the queue with each musketeer whose f value is
+	within the bound, so a single series of iterations covers all of them.
+	The next bound is the lowest f value over the current one, and the
+	iterations share a table of the lowest g value of every cell, see
+	BoundedDfsPolicy. The search stops without a path once an iteration
+	leaves no node out for being over the bound.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:param musketeerPositions: A list of [row, col] of musketeers on the board.
+	:param diamondPosition: The [row, col] of diamond on the board.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:param upperBound: Only look for paths of fewer moves than this, or
+		for any path if None. Iterations stop once the bound on f values
+		reaches it, as every node they would add can't do better.
+	:param statistics: A dict to add the counts of the search to, or None.
+		Its 'iterations' are the number of iterations run, 'expansions'
+		the number of nodes expanded in all of them and 'reExpansions'
+		how many of those had been expanded before, in the same iteration
+		with a higher g value or in an earlier one.
+	:param landmarks: If True, use the landmark heuristic of the board
+		instead of the manhattan distance, see engine.landmark.
+	:returns: A tuple containing exploredNodes, searchQueue, shortestPath.
+		searchQueue is a SearchTrace of the queue in every iteration. With
+		TRACE_NONE only shortestPath and its length are returned.
 
-		exploredNodes.extend(newExploredNodes)
-		searchQueue.extend(newSearchQueue)
+	"""
+	trace = getTraceLevel(trace)
+	board = getBoard(board)
+	diamondCell = board.getCell(diamondPosition)
+	exploredNodes = [] if trace >= TRACE_EXPLORED else None
+	searchQueue = SearchTrace() if trace == TRACE_FULL else None
+	heuristic = getHeuristicValue
+	if landmarks:
+		heuristic = getLandmarkTable(board).getHeuristicValue
+
+	# Use the smallest heuristic value from the start nodes as the
+	# initial bound.
+	bound = min(
+		heuristic(board, board.getCell(musketeerPosition), diamondCell)
+		for musketeerPosition in musketeerPositions
+	)
 
-		if len(shortestPath) == 0:
-			# Increase the bound and restart search.
-			bound = nextBound
-		else:
+	shortestPath = []
+	policy = None
+	while upperBound is None or bound < upperBound:
+		(newExploredNodes, newSearchQueue, shortestPath, nextBound, policy) = \
+			idaStarIteration(board, musketeerPositions, diamondPosition, bound,
+							 trace, policy, heuristic)
+
+		if exploredNodes is not None:
+			exploredNodes.extend(newExploredNodes)
+		if searchQueue is not None:
+			searchQueue.extend(newSearchQueue)
+
+		if len(shortestPath) != 0:
 			# Goal found.
 			break
+		if nextBound == -1:
+			# Every node reachable was within the bound, there is no path.
+			break
+		# Increase the bound and restart search.
+		bound = nextBound
 
-	return exploredNodes, searchQueue, shortestPath
+	if policy is not None:
+		addStatistics(statistics, policy)
+	return getSearchResult(trace, exploredNodes, searchQueue, shortestPath)
 
-def idaStarIteration(board, musketeerPosition, diamondPosition, bound):
+def idaStarIteration(board, musketeerPositions, diamondPosition, bound,
+					 trace=TRACE_FULL, policy=None, heuristic=None):
 	""" Perform a single iteration of IDA* search on the game board with
 	the given bound.
 
-	:param board: The game board.
-	:param musketeerPosition: The [row, col] of musketeer on the board.
+	:param board: The game board, a Board or a 2d list of integers.
+	:param musketeerPositions: A list of [row, col] of musketeers on the board.
 	:param diamondPosition: The [row, col] of diamond on the board.
 	:param bound: The threshold on f value for this iteration. Neighbour
 		nodes having f value greater than this aren't explored in this
 		iteration.
-	:returns: A tuple containing exploredNodes, searchQueue, shortestPath,
-		and the next higher bound to start with in the next iteration in
-		case the goal isn't found in this iteration.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels.
+	:param policy: The BoundedDfsPolicy of the previous iteration, to keep
+		its table of the lowest g value of every cell, or None for the first
+		iteration.
+	:param heuristic: A function returning the heuristic value of a cell,
+		called like getHeuristicValue, which it is if None. Only used for
+		the first iteration, the policy keeps it.
+	:returns: A tuple containing exploredNodes, searchQueue (a SearchTrace),
+		shortestPath, the next higher bound to start with in the next
+		iteration in case the goal isn't found in this iteration, -1 if no
+		node was over the bound, and the policy for the next iteration.
+		exploredNodes and searchQueue are None when not recorded.
 
 	"""
-	totalRows = totalColumns = len(board)
-	exploredNodes, searchQueue, iterativeSearchQueue, shortestPath = [],[],[],[]
-	# List of nodes visited and the position from which they were visited.
-	# Used for calculating shortest path.
-	visited = [[False for i in range(totalRows)] for i in range(totalColumns)]
-
-	goalFound = False
-	nextBound = -1
-
-	musketeerNode = Node(
-		musketeerPosition,
-		getHeuristicValue(musketeerPosition, diamondPosition),
-		0 # g value from start node.
+	board = getBoard(board)
+	if policy is None:
+		policy = BoundedDfsPolicy(board.getCell(diamondPosition), bound,
+								  heuristic)
+	else:
+		policy.bound = bound
+	(exploredNodes, searchQueue, shortestPath) = graphSearch(
+		board, [board.getCell(position) for position in musketeerPositions],
+		policy, trace
 	)
-	searchQueue.append(musketeerNode)
-	while len(searchQueue) != 0:
-		currentNode = searchQueue[0]
-		del(searchQueue[0])
+	return (exploredNodes, searchQueue, shortestPath, policy.nextBound, policy)
 
-		[row, col] = currentNode.position
-		currentGVal = currentNode.gVal
+def fringeSearch(board, musketeerPosition, diamondPosition, trace=TRACE_FULL,
+				 statistics=None, landmarks=False, upperBound=None):
+	""" Perform a fringe search on the game board.
 
-		exploredNodes.append([row, col])
-
-		if board[row][col] == DIAMOND:
-			# Diamong found! Append the remaining queue as part of this
-			# iteration and break.
-			goalFound = True
-			iterativeSearchQueue.append(getNodePositionsFromQueue(searchQueue))
-			break
-
-		paths = numberOfPaths(board, [row, col], visited)
-		neighbours = []
-		for path in paths:
-			heuristicVal = getHeuristicValue(path, diamondPosition)
-			pathNode = Node(path, heuristicVal, currentGVal + 1)
-			if pathNode.fVal > bound:
-				# Neighbouring node has greater f value. Don't explore it
-				# in this search iteration.
-				if nextBound == -1:
-					# Remember to start with the next higher f value in next
-					# iteration if goal isn't found in this iteration.
-					nextBound = pathNode.fVal
-				continue
-			visited[path[0]][path[1]] = [row, col]
-			neighbours.append(pathNode)
-
-		# Append to the front of the queue.
-		searchQueue = neighbours + searchQueue
-		iterativeSearchQueue.append(getNodePositionsFromQueue(searchQueue))
-
-	if goalFound:
-		shortestPath = \
-			getShortestPath(visited, musketeerPosition, diamondPosition)
-
-	return (exploredNodes, iterativeSearchQueue, shortestPath, nextBound)
-
-def getNodePositionsFromQueue(queue):
-	""" Return the positions of the node presently in the queue.
-
-	Extracts position from each Node object in the queue and puts in
-	a list.
-
-	:param queue: The queue.
-	:return: A list of positions of the node in the queue.
-
-	"""
-	positions = [node.position for node in queue]
-	return positions
+	:param board: The game board, a Board or a 2d list of integers.
+	:param musketeerPosition: The [row, col] of musketeer on the board.
+	:param diamondPosition: The [row, col] of diamond on the board.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:param statistics: A dict to add the counts of the search to, see
+		multiSourceFringeSearch, or None.
+	:param landmarks: If True, use the landmark heuristic of the board
+		instead of the manhattan distance, see engine.landmark.
+	:param upperBound: Only look for paths of fewer moves than this, or
+		for any path if None. Nodes whose f value reaches it are pruned.
+	:returns: A tuple containing exploredNodes, searchQueue, shortestPath,
+		or shortestPath and its length with TRACE_NONE.
 
-def printSearchQueue(queue, bound):
-	""" Print positions present in the queue
 	"""
-	for node in queue:
-		print node.position, bound
-	print
-
-def getHeuristicValue(position, diamondPosition):
-	""" Return the heuristic value of a position.
-
-	:param position: The position whose heuristic value is to be calculated.
-	:param diamondPosition: The position of the diamond on the board.
-	:return: The heuristic value of the position.
+	return multiSourceFringeSearch(board, [musketeerPosition], diamondPosition,
+								   trace, upperBound, statistics, landmarks)
+
+def multiSourceFringeSearch(board, musketeerPositions, diamondPosition,
+							trace=TRACE_FULL, upperBound=None, statistics=None,
+							landmarks=False):
+	""" Perform a fringe search starting from all the given musketeers at
+	once.
+
+	Fringe search raises a bound on f values like IDA*, but keeps the nodes
+	left over the bound and goes on from them when it is raised instead of
+	starting over, see engine.search.FringePolicy. The whole search is thus
+	a single run, recorded as one trace in the same format as the others.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:param musketeerPositions: A list of [row, col] of musketeers on the board.
+	:param diamondPosition: The [row, col] of diamond on the board.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:param upperBound: Only look for paths of fewer moves than this, or
+		for any path if None. Nodes whose f value reaches it are pruned.
+	:param statistics: A dict to add the counts of the search to, or None.
+		Its 'iterations' are the number of bounds searched under,
+		'expansions' the number of nodes expanded and 'reExpansions' how
+		many of those had been expanded before with a higher g value.
+	:param landmarks: If True, use the landmark heuristic of the board
+		instead of the manhattan distance, see engine.landmark.
+	:returns: A tuple containing exploredNodes, searchQueue, shortestPath,
+		or shortestPath and its length with TRACE_NONE.
 
 	"""
-	return (
-		abs(position[0] - diamondPosition[0]) + 
-		abs(position[1] - diamondPosition[1])
+	trace = getTraceLevel(trace)
+	board = getBoard(board)
+	diamondCell = board.getCell(diamondPosition)
+	startCells = [board.getCell(position) for position in musketeerPositions]
+	heuristic = getHeuristicValue
+	if landmarks:
+		heuristic = getLandmarkTable(board).getHeuristicValue
+
+	# Use the smallest heuristic value from the start nodes as the
+	# initial bound.
+	bound = min(heuristic(board, cell, diamondCell) for cell in startCells)
+	if upperBound is not None and bound >= upperBound:
+		# No path from these musketeers can do better, don't even start.
+		exploredNodes = [] if trace >= TRACE_EXPLORED else None
+		searchQueue = SearchTrace() if trace == TRACE_FULL else None
+		return getSearchResult(trace, exploredNodes, searchQueue, [])
+
+	policy = FringePolicy(diamondCell, bound, upperBound, heuristic)
+	(exploredNodes, searchQueue, shortestPath) = graphSearch(
+		board, startCells, policy, trace
 	)
+	addStatistics(statistics, policy)
+	return getSearchResult(trace, exploredNodes, searchQueue, shortestPath)
 
+def addStatistics(statistics, policy):
+	""" Add the counts of a search to a statistics dict.
 
-def numberOfPaths(board, pos, visited):
-	""" Return different possible paths from a given position.
-	todo
-	Return the different possible paths that can be taken from a
-	given position excluding the one's which are already taken.
-
-	:param board: The game board.
-	:param pos: The [row, col] from which to calculate possible paths.
-	:param visited: A 2d list containing a [row, col] for indexes 
-		which are already visited describing the position they were visited
-		from and False for unvisited indexes.
-	:returns: A list containing the [row, col] of the possible direction
-		to proceed in.
+	:param statistics: The dict to add them to, or None.
+	:param policy: The BoundedDfsPolicy or FringePolicy of the search.
 
 	"""
-	[row, col] = pos
-	totalRows = totalColumns = len(board)
-	paths = []
-	if col != 0:
-		if visited[row][col-1] == False \
-		and hasSoldierOrDiamond(board[row][col-1]):
-			paths.append([row, col-1])
-	if row != totalRows - 1:
-		if visited[row+1][col] == False \
-		and hasSoldierOrDiamond(board[row+1][col]):
-			paths.append([row + 1, col])
-	if col != totalColumns - 1:
-		if visited[row][col+1] == False \
-		and hasSoldierOrDiamond(board[row][col+1]):
-			paths.append([row, col+1])
-	if row != 0:
-		if visited[row-1][col] == False \
-		and hasSoldierOrDiamond(board[row-1][col]):
-			paths.append([row-1, col])
-	return paths
-
-def getMusketeerAndDiamondPositions(board):
-	""" Return the position of musketeers and diamond on the game board.
-
-	:param board: The game board.
-	:return: A tuple containing a list of muskeeter positions and [row, col]
-		for the diamond position.
-
-	"""
-	muskeeterPositions = []
-	diamondPosition = []
-	for i in range(len(board)):
-		for j in range(len(board[i])):
-			if board[i][j] == 1:
-				muskeeterPositions.append([i,j])
-			elif board[i][j] == DIAMOND:
-				diamondPosition = [i, j]
-	return (muskeeterPositions, diamondPosition)
-
-def getShortestPath(visited,  musketeerPosition, diamondPosition):
-	""" Return shortest path from diamondPosition to musketeerPosition.
-
-	This essentially backtraces from diamondPosition to musketeerPosition
-	using the visited list.
-
-	:param visited: The visited 2d list
-	:param musketeerPosition: The [row, col] of musketeer on the board.
-	:param diamondPosition: The [row, col] of the found diamond on the board. 
-	:returns: A list containing the shortest path from musketeer's position
-		to diamond's position.
-
-	-- note::
-		This should only be called if diamond is found else it might get stuck
-		for time and beyond.
-
-	"""
-	shortestPath = []
-	[x, y] = diamondPosition
-	shortestPath.append([x, y])
-	while [x, y] != musketeerPosition:
-		[x, y] = visited[x][y]
-		shortestPath.append([x, y])
-
-	# Since we backtrace from the diamond's position to muskeeter position,
-	# we need to reverse the list to return the path from muskeeter to diamond.
-	return shortestPath[::-1]
-
-def hasSoldierOrDiamond(thing):
-	return (thing == SOLDIER or thing == DIAMOND)
-
+	if statistics is None:
+		return
+	for name in ('iterations', 'expansions', 'reExpansions'):
+		statistics[name] = statistics.get(name, 0) + getattr(policy, name)
 
 class NoMusketeerFound(Exception):
     pass
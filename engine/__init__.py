@@ -0,0 +1,2 @@
+""" Pieces shared by the search controllers of every algorithm folder.
+"""
@@ -0,0 +1,193 @@
+""" Solving many boards at once, headless, on a pool of worker processes.
+
+Run from the top folder with
+
+	python -m engine.batch --algorithm astar boards/ more.txt
+
+Every directory given holds one board per file, text like input.txt or
+binary, but for the landmark tables engine.landmark writes next to them,
+and so does a binary board file. Every other file, or - for the
+standard input, is a stream of text boards one after another, separated
+by blank lines. One line is written per board, in the order they were
+given, with tab separated fields:
+
+	name  moves  path  expanded  seconds
+
+where name is the file of the board, with the line it starts at for a
+stream, moves is -1 and path - if there is no path, path is the row,col of
+every position on it separated by spaces, expanded is the number of nodes
+the search explored and seconds the time spent reading and solving the
+board. A board which can't be solved gets the line
+
+	name  error  message
+
+instead.
+
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+
+from engine.binary import isBinaryBoard
+from engine.board import loadBoard, readBoard
+from engine.landmark import LANDMARK_SUFFIX
+from engine.solver import ALGORITHMS, formatPath, getController
+from engine.trace import TRACE_EXPLORED
+
+# Number of boards handed to a worker process at a time.
+CHUNK_SIZE = 32
+
+# The controller module a worker process solves boards with.
+workerController = None
+
+def initWorker(algorithm):
+	""" Load the controller a worker process solves boards with.
+
+	What the controllers print goes to the standard error, so it doesn't get
+	mixed up with the result lines.
+
+	"""
+	global workerController
+	workerController = getController(algorithm)
+	sys.stdout = sys.stderr
+
+def getTasks(paths):
+	""" Yield a task for every board in the given files and directories.
+
+	:param paths: Paths of directories of board files, of files of boards
+		separated by blank lines, or - for the standard input.
+	:returns: A generator of tuples containing the name of a board and
+		either the path of its file or the list of its lines.
+
+	"""
+	for path in paths:
+		if os.path.isdir(path):
+			for name in sorted(os.listdir(path)):
+				boardPath = os.path.join(path, name)
+				if os.path.isfile(boardPath) \
+				and not name.endswith(LANDMARK_SUFFIX):
+					yield (boardPath, boardPath)
+		elif path == '-':
+			for task in splitBoards('-', sys.stdin):
+				yield task
+		elif isBinaryBoard(path):
+			yield (path, path)
+		else:
+			with open(path) as boardFile:
+				for task in splitBoards(path, boardFile):
+					yield task
+
+def splitBoards(name, lines):
+	""" Yield a task for every board in a stream of boards.
+
+	:param name: Name of the stream.
+	:param lines: An iterable of the lines of the stream, boards separated
+		by one or more blank lines.
+	:returns: A generator of tuples containing name:line, line being the
+		number of the first line of a board, and the list of its lines.
+
+	"""
+	rows = []
+	for (lineNumber, line) in enumerate(lines, 1):
+		if line.strip() == '':
+			if len(rows) != 0:
+				yield ('%s:%d' % (name, lineNumber - len(rows)), rows)
+				rows = []
+		else:
+			rows.append(line)
+	if len(rows) != 0:
+		yield ('%s:%d' % (name, lineNumber + 1 - len(rows)), rows)
+
+def solveBoard(task):
+	""" Solve a board in a worker process.
+
+	:param task: A tuple containing the name of the board and either the
+		path of its file or the list of its lines.
+	:returns: The result line of the board, without a line break.
+
+	"""
+	(name, source) = task
+	start = time.time()
+	try:
+		if isinstance(source, list):
+			board = readBoard(source)
+		else:
+			board = loadBoard(source)
+		result = workerController.singleAgentSearch(board, trace=TRACE_EXPLORED)
+		if result is None:
+			raise ValueError('no musketeer on the board')
+	except Exception as error:
+		message = type(error).__name__
+		if str(error) != '':
+			message += ': %s' % error
+		return '%s\terror\t%s' % (name, message)
+	seconds = time.time() - start
+
+	(exploredNodes, _, shortestPath) = result
+	return '%s\t%d\t%s\t%d\t%.6f' % (
+		name, len(shortestPath) - 1, formatPath(shortestPath),
+		len(exploredNodes), seconds
+	)
+
+def solveBoards(algorithm, paths, output, processes=None,
+				chunkSize=CHUNK_SIZE):
+	""" Solve every board in the given files and directories.
+
+	:param algorithm: One of the names in engine.solver.ALGORITHMS.
+	:param paths: Paths of directories of board files, of files of boards
+		separated by blank lines, or - for the standard input.
+	:param output: File to write the result line of every board to.
+	:param processes: Number of worker processes, by default one per CPU.
+		With 1 the boards are solved in this process.
+	:param chunkSize: Number of boards handed to a worker process at a time.
+	:returns: The number of boards solved.
+
+	"""
+	tasks = getTasks(paths)
+	pool = None
+	stdout = sys.stdout
+	if processes == 1:
+		initWorker(algorithm)
+		lines = itertools.imap(solveBoard, tasks)
+	else:
+		pool = multiprocessing.Pool(processes, initWorker, (algorithm,))
+		lines = pool.imap(solveBoard, tasks, chunkSize)
+
+	count = 0
+	try:
+		for line in lines:
+			output.write(line + '\n')
+			count += 1
+	finally:
+		sys.stdout = stdout
+		if pool is not None:
+			pool.terminate()
+			pool.join()
+	return count
+
+def main(arguments=None):
+	""" Run the batch solver from the command line.
+	"""
+	parser = argparse.ArgumentParser(
+		prog='python -m engine.batch',
+		description='Solve many boards, one result line per board.'
+	)
+	parser.add_argument('paths', nargs='+', metavar='path',
+						help='directory of board files, file of boards '
+						'separated by blank lines, or - for the standard input')
+	parser.add_argument('-a', '--algorithm', choices=list(ALGORITHMS),
+						default='astar')
+	parser.add_argument('-p', '--processes', type=int, default=None,
+						help='number of worker processes, one per CPU by default')
+	parser.add_argument('-c', '--chunk-size', type=int, default=CHUNK_SIZE,
+						help='number of boards handed to a worker at a time')
+	arguments = parser.parse_args(arguments)
+
+	solveBoards(arguments.algorithm, arguments.paths, sys.stdout,
+				arguments.processes, arguments.chunk_size)
+
+if __name__ == '__main__':
+	main()
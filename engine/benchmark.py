@@ -0,0 +1,100 @@
+""" Timing the searches on boards of growing size.
+
+Run from the top folder with
+
+	python -m engine.benchmark [cells]
+
+to time bfs, dfs and an iteration of IDA* on square boards from 10,000
+cells up to the given number, 10,000,000 by default. Every board has a
+musketeer in the top left corner and the diamond walled off by empty cells
+in the bottom right one, so every search has to explore every cell it can
+reach before giving up. With O(1) pushes and pops on the frontier the time
+per cell stays the same as the boards grow.
+
+bfs and dfs search a board of soldiers only. IDA* expands a cell again
+whenever it finds a shorter way there, which on such a board its depth
+first order keeps doing, so it searches a comb instead: soldiers along the
+top row and down every other column, with a single way to every cell.
+
+"""
+import sys
+import time
+
+from engine.board import DIAMOND, EMPTY, MUSKETEER, SOLDIER, Board
+from engine.solver import getController
+from engine.trace import TRACE_NONE
+
+# Number of cells of the largest board timed by default.
+DEFAULT_CELLS = 10 ** 7
+
+def buildBoard(side, comb=False):
+	""" Return a square board the searches explore all of.
+
+	:param side: Number of rows and columns of the board.
+	:param comb: If True, the columns of odd index are empty below the top
+		row.
+	:returns: A Board of soldiers with a musketeer in the top left corner
+		and an unreachable diamond in the bottom right one.
+
+	"""
+	cells = bytearray([SOLDIER]) * (side * side)
+	if comb:
+		for column in range(1, side, 2):
+			cells[side + column::side] = bytearray([EMPTY]) * (side - 1)
+	cells[0] = MUSKETEER
+	cells[-1] = DIAMOND
+	cells[-2] = EMPTY
+	cells[-1 - side] = EMPTY
+	return Board(cells, side, side)
+
+def getSearches():
+	""" Return the searches to time, as tuples of a name, whether it
+	searches a comb and a function searching a board from its top left
+	corner.
+	"""
+	bfs = getController('bfs')
+	dfs = getController('dfs')
+	idaStar = getController('idastar')
+	return [
+		('bfs', False,
+			lambda board: bfs.bfsSearch(board, [0, 0], TRACE_NONE)),
+		('dfs', False,
+			lambda board: dfs.dfsSearch(board, [0, 0], TRACE_NONE)),
+		# A bound no f value reaches, so the iteration takes in every cell.
+		('idastar', True, lambda board: idaStar.idaStarIteration(
+			board, [[0, 0]], board.getPosition(board.size - 1), board.size * 2,
+			TRACE_NONE
+		)),
+	]
+
+def runBenchmark(maxCells=DEFAULT_CELLS, output=sys.stdout):
+	""" Time every search on boards of 10,000 cells and ten times more up to
+	maxCells, writing a line per search and board.
+
+	:param maxCells: Number of cells of the largest board.
+	:param output: File to write the timings to.
+
+	"""
+	searches = getSearches()
+	output.write('%-8s %12s %10s %12s\n' % (
+		'search', 'cells', 'seconds', 'ns per cell'
+	))
+	cells = 10 ** 4
+	while cells <= maxCells:
+		side = int(round(cells ** 0.5))
+		boards = {}
+		for (name, comb, search) in searches:
+			if comb not in boards:
+				boards[comb] = buildBoard(side, comb)
+			board = boards[comb]
+			start = time.time()
+			search(board)
+			seconds = time.time() - start
+			output.write('%-8s %12d %10.3f %12.0f\n' % (
+				name, board.size, seconds, seconds * 1e9 / board.size
+			))
+			output.flush()
+		cells *= 10
+
+if __name__ == '__main__':
+	runBenchmark(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CELLS)
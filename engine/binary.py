@@ -0,0 +1,145 @@
+""" Binary board files which are mapped into memory instead of parsed.
+
+A binary board file is a fixed size header followed by the cells of the
+board, one byte per cell, row after row:
+
+	magic       4 bytes, BINARY_MAGIC
+	version     1 byte, BINARY_VERSION
+	musketeers  1 byte, number of musketeers on the board
+	            2 bytes of padding
+	rows        8 bytes
+	columns     8 bytes
+	diamond     8 bytes, cell of the diamond or -1 if there is none
+	musketeer   8 bytes for each of the MAX_MUSKETEERS musketeer cells,
+	            -1 for the unused ones
+
+with every number little endian. Convert an input.txt with
+
+	python -m engine.binary input.txt board.bin
+
+"""
+import ctypes
+import mmap
+import struct
+import sys
+
+from engine.board import (
+	DIAMOND, MAX_MUSKETEERS, MUSKETEER, Board, InvalidBoard, getBoard,
+	loadBoard
+)
+
+BINARY_MAGIC = 'MSKB'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<4sBBxxQQq%dq' % MAX_MUSKETEERS)
+
+def isBinaryBoard(path):
+	""" Return True if the file at path is a binary board file.
+	"""
+	with open(path, 'rb') as boardFile:
+		return boardFile.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+def writeBinaryBoard(board, path):
+	""" Write a board to a binary board file.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:param path: Path of the file to write.
+	:raises InvalidBoard: If the board has more than MAX_MUSKETEERS
+		musketeers or more than one diamond, as the header has no room
+		for them.
+
+	"""
+	board = getBoard(board)
+	musketeerCells = board.findCells(MUSKETEER)
+	diamondCells = board.findCells(DIAMOND)
+	if len(musketeerCells) > MAX_MUSKETEERS:
+		raise InvalidBoard('more than %d musketeers' % MAX_MUSKETEERS)
+	if len(diamondCells) > 1:
+		raise InvalidBoard('more than one diamond')
+
+	diamondCell = diamondCells[0] if len(diamondCells) != 0 else -1
+	unused = [-1] * (MAX_MUSKETEERS - len(musketeerCells))
+	header = BINARY_HEADER.pack(
+		BINARY_MAGIC, BINARY_VERSION, len(musketeerCells),
+		board.rows, board.columns, diamondCell, *(musketeerCells + unused)
+	)
+	with open(path, 'wb') as boardFile:
+		boardFile.write(header)
+		boardFile.write(board.cells)
+
+def convertBoard(textPath, binaryPath):
+	""" Convert a board file like input.txt to a binary board file.
+	"""
+	writeBinaryBoard(loadBoard(textPath), binaryPath)
+
+class MappedBoard(Board):
+	""" Board whose cells are read in place from a binary board file.
+
+	The file is mapped copy on write, which the searches never do, so
+	opening a board of any size only costs reading its header, cells are
+	only read from disk when a search gets to them and every process
+	opening the same file shares the same pages of memory. The musketeers
+	and the diamond are taken from the header instead of looking for them
+	in the cells.
+
+	"""
+	def __init__(self, path):
+		""" Open a binary board file.
+
+		:param path: Path of the file.
+		:raises InvalidBoard: If the file isn't a binary board file of this
+			version or it's cut short.
+
+		"""
+		with open(path, 'rb') as boardFile:
+			if len(boardFile.read(BINARY_HEADER.size)) < BINARY_HEADER.size:
+				raise InvalidBoard('%s: not a binary board file' % path)
+			mapping = mmap.mmap(boardFile.fileno(), 0,
+								access=mmap.ACCESS_COPY)
+
+		header = BINARY_HEADER.unpack_from(mapping)
+		(magic, version, musketeers, rows, columns, diamondCell) = header[:6]
+		if magic != BINARY_MAGIC or version != BINARY_VERSION:
+			raise InvalidBoard('%s: not a binary board file' % path)
+		if len(mapping) != BINARY_HEADER.size + rows * columns:
+			raise InvalidBoard('%s: expected %d cells, found %d' % (
+				path, rows * columns, len(mapping) - BINARY_HEADER.size
+			))
+
+		# A ctypes array over the mapping reads the cells as integers
+		# without copying them.
+		cells = (ctypes.c_ubyte * (rows * columns)).from_buffer(
+			mapping, BINARY_HEADER.size
+		)
+		super(MappedBoard, self).__init__(cells, rows, columns)
+		self.path = path
+		self.mapping = mapping
+		self.musketeerCells = list(header[6:6 + musketeers])
+		self.diamondCells = [diamondCell] if diamondCell != -1 else []
+
+	def __reduce__(self):
+		""" Pickle the board as the path of its file, so a worker process
+		the board is sent to maps the same file instead of getting a copy of
+		the cells.
+		"""
+		return (MappedBoard, (self.path,))
+
+	def findCells(self, value):
+		""" Return the index of every cell holding a value, in order.
+		"""
+		if value == MUSKETEER:
+			return list(self.musketeerCells)
+		if value == DIAMOND:
+			return list(self.diamondCells)
+
+		cells = []
+		needle = chr(value)
+		offset = self.mapping.find(needle, BINARY_HEADER.size)
+		while offset != -1:
+			cells.append(offset - BINARY_HEADER.size)
+			offset = self.mapping.find(needle, offset + 1)
+		return cells
+
+if __name__ == '__main__':
+	if len(sys.argv) != 3:
+		sys.exit('usage: python -m engine.binary input.txt board.bin')
+	convertBoard(sys.argv[1], sys.argv[2])
@@ -0,0 +1,275 @@
+from array import array
+import hashlib
+import string
+
+EMPTY = 0
+MUSKETEER = 1
+SOLDIER = 2
+DIAMOND = 3
+
+# Most musketeers a board read from a file may have.
+MAX_MUSKETEERS = 3
+
+# Value of a cell not visited yet in a table returned by Board.newTable.
+UNVISITED = -1
+
+# Turns the digits of an input file into the byte of each cell.
+CELL_CODES = string.maketrans('0123', '\x00\x01\x02\x03')
+
+class InvalidBoard(ValueError):
+	pass
+
+def getBoard(board):
+	""" Return the compact version of a board.
+
+	:param board: A Board, or a 2d list of integers.
+	:returns: board itself if it is a Board already, else a new Board with
+		the same cells.
+
+	"""
+	if isinstance(board, Board):
+		return board
+	return Board.fromRows(board)
+
+def loadBoard(path):
+	""" Read a Board from a file like input.txt, or open a binary board
+	file.
+
+	:param path: Path of the file.
+	:returns: A MappedBoard for a binary board file, else the Board read
+		by readBoard.
+	:raises InvalidBoard: If the file doesn't hold a valid board.
+
+	"""
+	# Imported here since engine.binary builds on this module.
+	from engine.binary import MappedBoard, isBinaryBoard
+	if isBinaryBoard(path):
+		return MappedBoard(path)
+	with open(path) as boardFile:
+		return readBoard(boardFile)
+
+def readBoard(lines):
+	""" Read a Board from lines of space separated cell codes.
+
+	Every line holds one row of the board, as the digits 0 to 3 described
+	in the README, and blank lines are skipped. The lines are consumed one
+	at a time and every row goes straight into the cells of the board, so
+	a file object can be passed in to read boards far bigger than would
+	fit in memory as a 2d list.
+
+	:param lines: An iterable of the lines, like an open file.
+	:returns: The Board.
+	:raises InvalidBoard: If a cell isn't one of the codes, the rows aren't
+		all the same length or there are more than MAX_MUSKETEERS
+		musketeers.
+
+	"""
+	cells = bytearray()
+	rows = columns = musketeers = 0
+	for (lineNumber, line) in enumerate(lines, 1):
+		codes = line.split()
+		if len(codes) == 0:
+			continue
+		row = ''.join(codes)
+		if len(row) != len(codes) or row.translate(None, '0123') != '':
+			raise InvalidBoard(
+				'line %d: cells must be one of 0, 1, 2 or 3' % lineNumber
+			)
+		if rows == 0:
+			columns = len(codes)
+		elif len(codes) != columns:
+			raise InvalidBoard(
+				'line %d: expected %d cells, found %d'
+				% (lineNumber, columns, len(codes))
+			)
+		musketeers += row.count('1')
+		if musketeers > MAX_MUSKETEERS:
+			raise InvalidBoard(
+				'line %d: more than %d musketeers'
+				% (lineNumber, MAX_MUSKETEERS)
+			)
+		cells += row.translate(CELL_CODES)
+		rows += 1
+	return Board(cells, rows, columns)
+
+class Board(object):
+	""" Game board stored as one byte per cell.
+
+	Cells are kept row after row in a flat bytearray and addressed by their
+	index in it, row * columns + col. Searches on a Board track their state
+	in flat integer tables indexed the same way instead of 2d lists holding
+	a [row, col] list per position, which takes a few bytes per cell instead
+	of hundreds.
+
+	"""
+	def __init__(self, cells, rows, columns):
+		""" Initialize a board.
+
+		:param cells: A bytearray of the cells, row after row.
+		:param rows: Number of rows on the board.
+		:param columns: Number of columns on the board.
+		:raises InvalidBoard: If there aren't rows * columns cells.
+
+		"""
+		super(Board, self).__init__()
+		if len(cells) != rows * columns:
+			raise InvalidBoard(
+				'expected %d cells, found %d' % (rows * columns, len(cells))
+			)
+		self.cells = cells
+		self.rows = rows
+		self.columns = columns
+		self.size = rows * columns
+		# Worked out by getKey, forgotten by setCell.
+		self.key = None
+
+	@classmethod
+	def fromRows(cls, rows):
+		""" Return a board holding the cells of a 2d list.
+
+		:param rows: The board as a 2d list of integers, rows of any but
+			the same length.
+		:returns: The Board.
+		:raises InvalidBoard: If the rows aren't all the same length.
+
+		"""
+		columns = len(rows[0]) if len(rows) != 0 else 0
+		cells = bytearray()
+		for row in rows:
+			if len(row) != columns:
+				raise InvalidBoard('board rows must all have the same length')
+			cells += bytearray(row)
+		return cls(cells, len(rows), columns)
+
+	def getKey(self):
+		""" Return a key identifying the cells of the board, to cache what
+		is worked out from them on.
+
+		The key holds a digest of the cells, worked out the first time it is
+		asked for and kept until a cell is changed with setCell, so a lookup
+		only costs the whole board once. The Boards built from the same 2d
+		list share the same key.
+
+		:returns: A tuple containing the rows, the columns and the md5
+			digest of the cells.
+
+		-- note::
+			A cell written to self.cells directly rather than with setCell
+			leaves the key of the old cells.
+
+		"""
+		if self.key is None:
+			self.key = (self.rows, self.columns,
+						hashlib.md5(buffer(self.cells)).digest())
+		return self.key
+
+	def setCell(self, cell, value):
+		""" Change the value of a cell.
+
+		:param cell: The index of the cell.
+		:param value: Its new value, EMPTY, MUSKETEER, SOLDIER or DIAMOND.
+
+		"""
+		self.cells[cell] = value
+		self.key = None
+
+	def getCell(self, position):
+		""" Return the index of the cell at a [row, col] position.
+		"""
+		return position[0] * self.columns + position[1]
+
+	def getPosition(self, cell):
+		""" Return the [row, col] position of a cell.
+		"""
+		return list(divmod(cell, self.columns))
+
+	def findCells(self, value):
+		""" Return the index of every cell holding a value, in order.
+		"""
+		cells = []
+		needle = bytearray([value])
+		cell = self.cells.find(needle)
+		while cell != -1:
+			cells.append(cell)
+			cell = self.cells.find(needle, cell + 1)
+		return cells
+
+	def getNeighbours(self, cell):
+		""" Return the cells a musketeer can move into from a cell.
+
+		:param cell: The index of the cell to move from.
+		:returns: A list of the indexes of the neighbouring cells holding a
+			soldier or the diamond, in the order left, down, right, up.
+
+		"""
+		cells = self.cells
+		columns = self.columns
+		neighbours = []
+		col = cell % columns
+		if col != 0 and cells[cell - 1] >= SOLDIER: # Left
+			neighbours.append(cell - 1)
+		if cell + columns < self.size and cells[cell + columns] >= SOLDIER: # Down
+			neighbours.append(cell + columns)
+		if col != columns - 1 and cells[cell + 1] >= SOLDIER: # Right
+			neighbours.append(cell + 1)
+		if cell >= columns and cells[cell - columns] >= SOLDIER: # Up
+			neighbours.append(cell - columns)
+		return neighbours
+
+	def getAdjacent(self, cell):
+		""" Return all the cells next to a cell, whatever they hold.
+
+		:param cell: The index of the cell.
+		:returns: A list of the indexes of the neighbouring cells on the
+			board, in the order left, down, right, up.
+
+		"""
+		columns = self.columns
+		adjacent = []
+		col = cell % columns
+		if col != 0: # Left
+			adjacent.append(cell - 1)
+		if cell + columns < self.size: # Down
+			adjacent.append(cell + columns)
+		if col != columns - 1: # Right
+			adjacent.append(cell + 1)
+		if cell >= columns: # Up
+			adjacent.append(cell - columns)
+		return adjacent
+
+	def getDistance(self, cell, other):
+		""" Return the manhattan distance between two cells.
+		"""
+		(row, col) = divmod(cell, self.columns)
+		(otherRow, otherCol) = divmod(other, self.columns)
+		return abs(row - otherRow) + abs(col - otherCol)
+
+	def newTable(self, value=UNVISITED):
+		""" Return a table holding an integer for every cell.
+
+		:param value: The value every cell starts with.
+		:returns: An array('i') of board.size integers.
+
+		"""
+		return array('i', [value]) * self.size
+
+	def getPath(self, parents, cell):
+		""" Backtrace the path a search took to reach a cell.
+
+		:param parents: A table mapping every cell reached to the cell it
+			was reached from, UNVISITED for the cells the search started
+			from.
+		:param cell: The index of the cell the path ends at.
+		:returns: A list of the [row, col] on the path, from the cell the
+			search started from to cell.
+
+		-- note::
+			If parents has a cycle, which a search overwriting the parent of
+			cells already reached can leave behind, this never returns.
+
+		"""
+		path = [self.getPosition(cell)]
+		while parents[cell] != UNVISITED:
+			cell = parents[cell]
+			path.append(self.getPosition(cell))
+		return path[::-1]
@@ -0,0 +1,212 @@
+""" Corridor graphs, the board with its corridors contracted into edges.
+
+Most cells of a maze-like board are in corridors: soldiers with exactly two
+neighbours a musketeer can move into, which it can only go through one way
+or the other. A search over the grid pushes and pops every one of them.
+Contracting them leaves a graph of the cells worth stopping at,
+
+	junctions       soldiers with three or four neighbours
+	dead ends       soldiers with one neighbour or none
+	diamonds        whatever their neighbours
+	musketeers      which only have edges out, nothing moves into them
+
+each with an edge to the node at the end of every corridor leaving it,
+weighted by the number of moves through it. Searching that graph with A*
+or Dijkstra's algorithm gives the same shortest paths, and the corridors
+on the one found are walked again to fill its cells back in.
+
+A board is compiled into its graph the first time it is searched and the
+graph is cached, so repeated queries on the same board skip that step.
+
+"""
+import collections
+
+from engine.board import DIAMOND, MUSKETEER, SOLDIER, getBoard
+from engine.search import WrappedPolicy
+
+# Maximum number of boards whose corridor graph is kept around.
+CORRIDOR_GRAPH_CACHE_SIZE = 8
+# Corridor graphs of the most recently queried boards keyed on Board.getKey.
+corridorGraphCache = collections.OrderedDict()
+
+class CorridorGraph(object):
+	""" The nodes of a board and the corridors between them.
+
+	Every node is mapped in self.edges to a list of its edges, tuples
+	containing the node at the other end, the number of moves to it and the
+	first cells of the corridor, enough to walk it again. Only the shortest
+	edge from a node to another one is kept.
+
+	"""
+	def __init__(self, board):
+		""" Compile the graph of a board.
+
+		:param board: The game board as a Board.
+
+		"""
+		super(CorridorGraph, self).__init__()
+		self.board = board
+		cells = board.cells
+		getNeighbours = board.getNeighbours
+		self.edges = {}
+		for cell in xrange(board.size):
+			if cells[cell] == MUSKETEER:
+				self.edges[cell] = self.getMusketeerEdges(cell)
+			elif cells[cell] >= SOLDIER and self.isNode(cell):
+				self.edges[cell] = self.getEdges(
+					cell, [(neighbour,) for neighbour in getNeighbours(cell)]
+				)
+
+	def isNode(self, cell):
+		""" Return whether a cell a musketeer can move into is a node, that is
+		not in the middle of a corridor.
+		"""
+		return self.board.cells[cell] == DIAMOND \
+			or len(self.board.getNeighbours(cell)) != 2
+
+	def getMusketeerEdges(self, cell):
+		""" Return the edges of a musketeer.
+
+		A musketeer isn't a neighbour of the cells next to it, so when it
+		moves into a corridor it can go on either way.
+
+		:param cell: The cell of the musketeer.
+		:returns: The list of edges of the musketeer.
+
+		"""
+		leads = []
+		for neighbour in self.board.getNeighbours(cell):
+			if self.isNode(neighbour):
+				leads.append((neighbour,))
+			else:
+				for nextCell in self.board.getNeighbours(neighbour):
+					leads.append((neighbour, nextCell))
+		return self.getEdges(cell, leads)
+
+	def getEdges(self, cell, leads):
+		""" Return the edges of a node.
+
+		:param cell: The cell of the node.
+		:param leads: The first cells of every corridor leaving the node.
+		:returns: A list of tuples containing the node at the end of a
+			corridor, the number of moves to it and the lead of the
+			corridor, the shortest one for every node.
+
+		"""
+		ends = {}
+		for lead in leads:
+			walk = self.walkCorridor(cell, lead)
+			end = walk[-1]
+			if end == cell or not self.isNode(end):
+				# Back where it started, or round a ring of corridor cells.
+				continue
+			if end not in ends or len(walk) < ends[end][1]:
+				ends[end] = (end, len(walk), lead)
+		return ends.values()
+
+	def walkCorridor(self, cell, lead):
+		""" Return the cells of a corridor, from the one after a node to the
+		node at its other end.
+
+		:param cell: The cell of the node the corridor leaves.
+		:param lead: The first cells of the corridor.
+		:returns: The list of the cells moved through, which ends on a node,
+			or on the first cell of lead again if it is in a ring of corridor
+			cells only.
+
+		"""
+		walk = list(lead)
+		previous = walk[-2] if len(walk) > 1 else cell
+		current = walk[-1]
+		while not self.isNode(current):
+			(first, second) = self.board.getNeighbours(current)
+			(previous, current) = (current, second if first == previous else first)
+			walk.append(current)
+			if current == lead[0]:
+				break
+		return walk
+
+	def getPath(self, nodes):
+		""" Return the path along the shortest edges between nodes.
+
+		:param nodes: The [row, col] of nodes, each one with an edge to the
+			next one.
+		:returns: The list of the [row, col] of every cell on the path.
+
+		"""
+		board = self.board
+		path = nodes[:1]
+		for (node, nextNode) in zip(nodes, nodes[1:]):
+			cell = board.getCell(node)
+			nextCell = board.getCell(nextNode)
+			for (end, _, lead) in self.edges[cell]:
+				if end == nextCell:
+					path.extend([
+						board.getPosition(step)
+						for step in self.walkCorridor(cell, lead)
+					])
+					break
+		return path
+
+class CorridorPolicy(WrappedPolicy):
+	""" Search over the corridor graph of the board on the frontier of
+	another policy.
+
+	The other policy is only offered the nodes of the graph, each with the
+	number of moves to it. Its trace thus holds the nodes pushed and
+	popped, and the explored nodes are the nodes of the graph expanded.
+
+	"""
+	def __init__(self, policy, graph=None):
+		""" Initialize the policy.
+
+		:param policy: A fresh FrontierPolicy to order the nodes on.
+		:param graph: The CorridorGraph of the board to be searched, or None
+			to get it from the cache when the search starts.
+
+		"""
+		super(CorridorPolicy, self).__init__(policy)
+		self.graph = graph
+
+	def start(self, board, searchTrace):
+		super(CorridorPolicy, self).start(board, searchTrace)
+		if self.graph is None:
+			self.graph = getCorridorGraph(board)
+
+	def expand(self, cell, gVal):
+		for (end, moves, _) in self.graph.edges[cell]:
+			self.policy.push([end], cell, gVal + moves)
+
+	def getPath(self, cell):
+		""" Return the path the search took to a cell, with the corridors
+		between its nodes filled in.
+		"""
+		return self.graph.getPath(self.board.getPath(self.parents, cell))
+
+def getCorridorGraph(board):
+	""" Return the corridor graph of the board, compiling it only if the
+	board isn't in the cache already.
+
+	The cache is keyed on Board.getKey, a digest of the cells worked out
+	once per board, so it is shared by the Boards built from the same 2d
+	list and never returns the graph of a board since changed with
+	Board.setCell.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:returns: The CorridorGraph of the board.
+
+	"""
+	board = getBoard(board)
+	key = board.getKey()
+	graph = corridorGraphCache.pop(key, None)
+	if graph is None:
+		graph = CorridorGraph(board)
+	corridorGraphCache[key] = graph
+	if len(corridorGraphCache) > CORRIDOR_GRAPH_CACHE_SIZE:
+		corridorGraphCache.popitem(last=False)
+	return graph
+
+def clearCorridorGraphCache():
+	""" Forget the corridor graphs of all the boards queried so far.
+	"""
+	corridorGraphCache.clear()
@@ -0,0 +1,134 @@
+""" Distance fields, the number of moves from every cell to the diamond.
+"""
+import collections
+
+from engine.board import DIAMOND, UNVISITED, getBoard
+from engine.trace import (
+	SearchTrace, TRACE_EXPLORED, TRACE_FULL, getSearchResult, getTraceLevel
+)
+
+# Maximum number of boards whose distance field is kept around.
+DISTANCE_FIELD_CACHE_SIZE = 8
+# Distance fields of the most recently queried boards keyed on Board.getKey.
+distanceFieldCache = collections.OrderedDict()
+
+def getShortestPathToDiamond(board, position):
+	""" Return the shortest path from any position to the diamond.
+
+	Walks down the distance field of the board, which is built with a
+	single reverse bfs from the diamond the first time the board is
+	queried and reused afterwards, so every further query only costs the
+	length of the path instead of a search over the whole board.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:param position: The [row, col] from which to find the shortest path.
+	:returns: A list containing the shortest path from position to the
+		diamond's position or an empty list if the diamond can't be reached.
+
+	"""
+	(board, distances) = getDistanceField(board)
+	cell = board.getCell(position)
+	shortestPath = [board.getPosition(cell)]
+	distance = distances[cell]
+	while distance != 0:
+		# Step onto the neighbour closest to the diamond. On the shortest
+		# path it is always exactly one move closer than the current one.
+		nextCell, nextDistance = None, distance
+		for neighbour in board.getNeighbours(cell):
+			if distances[neighbour] != UNVISITED \
+			and (nextDistance == UNVISITED or distances[neighbour] < nextDistance):
+				nextCell, nextDistance = neighbour, distances[neighbour]
+		if nextCell is None:
+			# Diamond can't be reached from here.
+			return []
+		cell, distance = nextCell, nextDistance
+		shortestPath.append(board.getPosition(cell))
+	return shortestPath
+
+def distanceFieldSearch(board, musketeerPositions, trace=TRACE_FULL):
+	""" Find the shortest path from any musketeer to a diamond by walking
+	down the distance field of the board.
+
+	The field is built with a single bfs backwards from the diamonds the
+	first time a board is queried and cached by getDistanceField, so every
+	further query on the same cells only costs the length of the paths.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:param musketeerPositions: A list of [row, col] of musketeers on the board.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool. No nodes are explored and no queue is kept, so
+		exploredNodes and searchQueue are empty when recorded.
+	:returns: A tuple containing exploredNodes, searchQueue, shortestPath,
+		or shortestPath and its length with TRACE_NONE.
+
+	"""
+	trace = getTraceLevel(trace)
+	board = getBoard(board)
+	shortestPath = []
+	for musketeerPosition in musketeerPositions:
+		path = getShortestPathToDiamond(board, musketeerPosition)
+		if len(path) != 0 and (len(shortestPath) == 0
+							   or len(path) < len(shortestPath)):
+			shortestPath = path
+	return getSearchResult(
+		trace, [] if trace >= TRACE_EXPLORED else None,
+		SearchTrace() if trace == TRACE_FULL else None, shortestPath
+	)
+
+def getDistanceField(board):
+	""" Return the distance field of the board, building it only if the
+	board isn't in the cache already.
+
+	The cache is keyed on Board.getKey, a digest of the cells worked out
+	once per board, so it is shared by the Boards built from the same 2d
+	list and never returns the field of a board since changed with
+	Board.setCell.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:returns: A tuple containing the board as a Board and its distance
+		field as returned by buildDistanceField.
+
+	"""
+	board = getBoard(board)
+	key = board.getKey()
+	distances = distanceFieldCache.pop(key, None)
+	if distances is None:
+		distances = buildDistanceField(board)
+	distanceFieldCache[key] = distances
+	if len(distanceFieldCache) > DISTANCE_FIELD_CACHE_SIZE:
+		distanceFieldCache.popitem(last=False)
+	return (board, distances)
+
+def buildDistanceField(board):
+	""" Return the number of moves needed to reach the diamond from every
+	position on the board.
+
+	Performs a single bfs backwards from the diamond over the soldier and
+	diamond positions, since those are the only ones a musketeer can move
+	into.
+
+	:param board: The game board as a Board.
+	:returns: A table of the distance to the diamond for every cell from
+		which it can be reached and UNVISITED for the rest.
+
+	"""
+	distances = board.newTable()
+	searchQueue = board.findCells(DIAMOND)
+	for cell in searchQueue:
+		distances[cell] = 0
+
+	# Walk the queue with an index instead of popping from its front.
+	head = 0
+	while head < len(searchQueue):
+		cell = searchQueue[head]
+		head += 1
+		for neighbour in board.getNeighbours(cell):
+			if distances[neighbour] == UNVISITED:
+				distances[neighbour] = distances[cell] + 1
+				searchQueue.append(neighbour)
+	return distances
+
+def clearDistanceFieldCache():
+	""" Forget the distance fields of all the boards queried so far.
+	"""
+	distanceFieldCache.clear()
@@ -0,0 +1,225 @@
+import bisect
+import collections
+
+# Kinds of frontiers getFrontier can build.
+BUCKET_FRONTIER = 'bucket'
+ORDERED_FRONTIER = 'ordered'
+
+def getFrontier(kind, indexed=False):
+	""" Return an empty frontier of the given kind.
+
+	:param kind: One of the *_FRONTIER kinds.
+	:param indexed: If True, push returns the index in the ordered queue
+		the entry was inserted at.
+	:returns: A BucketFrontier or an OrderedFrontier.
+
+	"""
+	if kind == BUCKET_FRONTIER:
+		return BucketFrontier(indexed)
+	if kind == ORDERED_FRONTIER:
+		return OrderedFrontier(indexed)
+	raise ValueError('unknown frontier %r' % (kind,))
+
+class OrderedFrontier(object):
+	""" Priority queue which keeps its entries in order while they are
+	pushed and popped.
+
+	Entries are bucketed on their integer key and the buckets are kept
+	sorted on it, entries with the same key in the order they were pushed.
+	Popping takes the first entry of the lowest bucket, so the queue can be
+	read front to back at any time without sorting it, and the index an
+	entry is pushed at is known straight away.
+
+	"""
+	def __init__(self, indexed=False):
+		""" Initialize an empty frontier.
+
+		:param indexed: If True, push returns the index in the ordered
+			queue the entry was inserted at. This costs an extra step per
+			distinct lower key, so it is only worth it when the index is
+			needed, like for recording a SearchTrace.
+
+		"""
+		super(OrderedFrontier, self).__init__()
+		self.indexed = indexed
+		# Sorted keys of the non empty buckets.
+		self.keys = []
+		self.buckets = {}
+		self.size = 0
+
+	def push(self, item, key, tie=0):
+		""" Push an item onto the frontier.
+
+		:param item: The item to push.
+		:param key: The integer priority of item, lower comes first.
+		:param tie: Unused, items with equal keys always come out in the
+			order they were pushed.
+		:returns: The index item was inserted at in the ordered queue if the
+			frontier is indexed, else None.
+
+		"""
+		bucket = self.buckets.get(key)
+		if bucket is None:
+			bucket = collections.deque()
+			self.buckets[key] = bucket
+			bisect.insort(self.keys, key)
+
+		index = None
+		if self.indexed:
+			index = len(bucket)
+			for lowerKey in self.keys[:bisect.bisect_left(self.keys, key)]:
+				index += len(self.buckets[lowerKey])
+
+		bucket.append(item)
+		self.size += 1
+		return index
+
+	def pop(self):
+		""" Pop the item at the front of the frontier.
+
+		:returns: The item pushed first among those with the lowest key.
+
+		"""
+		key = self.keys[0]
+		bucket = self.buckets[key]
+		item = bucket.popleft()
+		if len(bucket) == 0:
+			del self.buckets[key]
+			del self.keys[0]
+		self.size -= 1
+		return item
+
+	def __len__(self):
+		return self.size
+
+	def __iter__(self):
+		""" Iterate over the items front to back.
+		"""
+		for key in self.keys:
+			for item in self.buckets[key]:
+				yield item
+
+class BucketFrontier(object):
+	""" Bucket queue (Dial's algorithm) for small non negative integer keys.
+
+	Items are kept in a list of buckets indexed directly on their key, so
+	pushing is O(1) and popping only has to move a cursor up to the lowest
+	non empty bucket. Since the keys of a search on a board are bounded by
+	the number of positions on it and, for A*, never drop below the key
+	last popped, the cursor only moves forward and popping is amortized
+	O(1) as well.
+
+	Within a bucket items are ordered on a second integer, the tie, lowest
+	first, and items with the same key and tie come out last in first out.
+	With the f value as key and the heuristic value as tie, A* prefers the
+	positions closest to the goal among those equally promising and keeps
+	following the last one it pushed, instead of widening its search.
+
+	"""
+	def __init__(self, indexed=False):
+		""" Initialize an empty frontier.
+
+		:param indexed: If True, push returns the index in the ordered
+			queue the entry was inserted at. This costs an extra step per
+			lower key and tie, so it is only worth it when the index is
+			needed, like for recording a SearchTrace.
+
+		"""
+		super(BucketFrontier, self).__init__()
+		self.indexed = indexed
+		# For every key a list of stacks indexed on the tie less the tie of
+		# the first one, or None.
+		self.buckets = []
+		# Number of items, tie of the first stack and lowest tie possibly in
+		# use for every key.
+		self.bucketSizes = []
+		self.firstTies = []
+		self.lowestTies = []
+		# No bucket below this key holds any item.
+		self.lowestKey = 0
+		self.size = 0
+
+	def push(self, item, key, tie=0):
+		""" Push an item onto the frontier.
+
+		:param item: The item to push.
+		:param key: The non negative integer priority of item, lower comes
+			first.
+		:param tie: The non negative integer deciding the order among
+			items with the same key, lower comes first.
+		:returns: The index item was inserted at in the ordered queue if the
+			frontier is indexed, else None.
+
+		"""
+		while len(self.buckets) <= key:
+			self.buckets.append(None)
+			self.bucketSizes.append(0)
+			self.firstTies.append(0)
+			self.lowestTies.append(0)
+		bucket = self.buckets[key]
+		if bucket is None:
+			bucket = self.buckets[key] = []
+			self.firstTies[key] = self.lowestTies[key] = tie
+		elif tie < self.firstTies[key]:
+			# Only the ties from the lowest one pushed get a stack, so keys
+			# far apart don't each cost a stack for every tie below theirs.
+			bucket[:0] = [[] for _ in xrange(self.firstTies[key] - tie)]
+			self.firstTies[key] = tie
+		offset = tie - self.firstTies[key]
+		while len(bucket) <= offset:
+			bucket.append([])
+
+		index = None
+		if self.indexed:
+			index = sum(self.bucketSizes[self.lowestKey:key])
+			for stack in bucket[:offset]:
+				index += len(stack)
+
+		bucket[offset].append(item)
+		self.bucketSizes[key] += 1
+		if tie < self.lowestTies[key]:
+			self.lowestTies[key] = tie
+		if self.size == 0 or key < self.lowestKey:
+			self.lowestKey = key
+		self.size += 1
+		return index
+
+	def pop(self):
+		""" Pop the item at the front of the frontier.
+
+		:returns: The item pushed last among those with the lowest key and
+			the lowest tie.
+		:raises IndexError: If the frontier is empty.
+
+		"""
+		if self.size == 0:
+			raise IndexError('pop from an empty frontier')
+		while self.bucketSizes[self.lowestKey] == 0:
+			self.lowestKey += 1
+		key = self.lowestKey
+		bucket = self.buckets[key]
+		firstTie = self.firstTies[key]
+		tie = self.lowestTies[key]
+		while len(bucket[tie - firstTie]) == 0:
+			tie += 1
+		self.lowestTies[key] = tie
+
+		item = bucket[tie - firstTie].pop()
+		self.bucketSizes[key] -= 1
+		if self.bucketSizes[key] == 0:
+			self.buckets[key] = None
+		self.size -= 1
+		return item
+
+	def __len__(self):
+		return self.size
+
+	def __iter__(self):
+		""" Iterate over the items front to back.
+		"""
+		for bucket in self.buckets[self.lowestKey:]:
+			if bucket is None:
+				continue
+			for stack in bucket:
+				for item in reversed(stack):
+					yield item
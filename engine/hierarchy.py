@@ -0,0 +1,470 @@
+""" Hierarchical path finding (HPA*) over clusters of the board.
+
+The board is cut into square clusters of CLUSTER_SIZE cells a side. Where
+two neighbouring clusters share a run of cells a musketeer can move
+across, the run is an entrance, and the cells on both sides of its middle,
+or of both its ends for a long one, become nodes of an abstract graph. The
+graph links every such pair with an edge of one move, and every two nodes
+of a cluster with an edge of the number of moves between them without
+leaving it, found by a bfs confined to the cluster.
+
+A search links the musketeers and the diamond to the nodes of their
+clusters the same way, runs A* over the graph, then refines the edges of
+the route found, one short A* in the cluster of each, leaving every cluster
+off the route alone. The path is as long as the abstract route, but not
+always a shortest one, as it can only cross between clusters at the nodes.
+
+The graph is built once per board and cached. When cells of the board
+change, ClusterGraph.updateCells rebuilds only the clusters they are in,
+with the entrances and edges of the clusters next to them.
+
+"""
+import collections
+
+from engine.board import DIAMOND, SOLDIER, UNVISITED, Board, getBoard
+from engine.frontier import BUCKET_FRONTIER
+from engine.search import FValuePolicy, WrappedPolicy, graphSearch
+from engine.trace import TRACE_NONE
+
+# Number of cells a side of a cluster.
+CLUSTER_SIZE = 32
+# Entrances of at least this many cells get a node at both ends instead of
+# one in the middle.
+LONG_ENTRANCE = 6
+
+# Maximum number of boards whose cluster graph is kept around.
+CLUSTER_GRAPH_CACHE_SIZE = 8
+# Cluster graphs of the most recently queried boards keyed on Board.getKey
+# and their cluster size.
+clusterGraphCache = collections.OrderedDict()
+
+class ClusterGraph(object):
+	""" The abstract graph of the entrances between the clusters of a board.
+
+	Nodes are cells, mapped in self.crossings to the cells across the
+	borders of their cluster they are linked to and in self.paths to a
+	dict of the other nodes of their cluster they can reach in it and the
+	number of moves to them.
+
+	"""
+	def __init__(self, board, clusterSize=CLUSTER_SIZE):
+		""" Build the graph of a board.
+
+		:param board: The game board as a Board, whose cells are copied so
+			that later changes only come in through updateCells.
+		:param clusterSize: Number of cells a side of a cluster.
+
+		"""
+		super(ClusterGraph, self).__init__()
+		self.board = Board(bytearray(buffer(board.cells)), board.rows,
+						   board.columns)
+		self.clusterSize = clusterSize
+		self.clusterRows = -(-board.rows // clusterSize)
+		self.clusterColumns = -(-board.columns // clusterSize)
+		# Pairs of cells linked across the border below and the border to
+		# the right of every cluster, keyed on (cluster, step) with step
+		# board.columns or 1.
+		self.entrances = {}
+		self.crossings = collections.defaultdict(list)
+		self.paths = {}
+		# Nodes of every cluster linked in self.paths.
+		self.clusterNodes = {}
+		clusterCount = self.clusterRows * self.clusterColumns
+		for cluster in xrange(clusterCount):
+			self.buildEntrances(cluster)
+		for cluster in xrange(clusterCount):
+			self.buildPaths(cluster)
+
+	def getCluster(self, cell):
+		""" Return the index of the cluster a cell is in.
+		"""
+		(row, col) = divmod(cell, self.board.columns)
+		return (row // self.clusterSize) * self.clusterColumns \
+			+ col // self.clusterSize
+
+	def getBounds(self, cluster):
+		""" Return the first row, first col, end row and end col of a
+		cluster, the ends excluded.
+		"""
+		(clusterRow, clusterCol) = divmod(cluster, self.clusterColumns)
+		row = clusterRow * self.clusterSize
+		col = clusterCol * self.clusterSize
+		return (row, col, min(row + self.clusterSize, self.board.rows),
+				min(col + self.clusterSize, self.board.columns))
+
+	def getNodes(self, cluster):
+		""" Return the set of nodes of a cluster.
+		"""
+		nodes = set()
+		for key in self.getBorders(cluster):
+			for pair in self.entrances.get(key, ()):
+				nodes.update(cell for cell in pair
+							 if self.getCluster(cell) == cluster)
+		return nodes
+
+	def getBorders(self, cluster):
+		""" Return the keys of the entrances on the four borders of a
+		cluster, the ones of the clusters to its left and above included.
+		"""
+		(clusterRow, clusterCol) = divmod(cluster, self.clusterColumns)
+		columns = self.board.columns
+		borders = [(cluster, 1), (cluster, columns)]
+		if clusterCol != 0:
+			borders.append((cluster - 1, 1))
+		if clusterRow != 0:
+			borders.append((cluster - self.clusterColumns, columns))
+		return borders
+
+	def buildEntrances(self, cluster):
+		""" Find the entrances across the border below a cluster and the one
+		to its right, replacing the ones found before.
+		"""
+		board = self.board
+		cells = board.cells
+		columns = board.columns
+		(row, col, endRow, endCol) = self.getBounds(cluster)
+		borders = []
+		if endCol != columns:
+			# Down the last column, linked to the next one.
+			borders.append((1, range(row * columns + endCol - 1,
+									  endRow * columns, columns)))
+		if endRow != board.rows:
+			# Along the last row, linked to the next one.
+			borders.append((columns, range((endRow - 1) * columns + col,
+											(endRow - 1) * columns + endCol)))
+
+		for (step, border) in borders:
+			key = (cluster, step)
+			for pair in self.entrances.pop(key, ()):
+				self.crossings[pair[0]].remove(pair[1])
+				self.crossings[pair[1]].remove(pair[0])
+			pairs = []
+			run = []
+			for cell in border + [None]:
+				if cell is not None and cells[cell] >= SOLDIER \
+				and cells[cell + step] >= SOLDIER:
+					run.append(cell)
+					continue
+				if len(run) >= LONG_ENTRANCE:
+					pairs.extend([(run[0], run[0] + step),
+								  (run[-1], run[-1] + step)])
+				elif len(run) != 0:
+					middle = run[len(run) // 2]
+					pairs.append((middle, middle + step))
+				run = []
+			for pair in pairs:
+				self.crossings[pair[0]].append(pair[1])
+				self.crossings[pair[1]].append(pair[0])
+			if len(pairs) != 0:
+				self.entrances[key] = pairs
+
+	def buildPaths(self, cluster):
+		""" Link every node of a cluster to the others it can reach without
+		leaving it, replacing the links found before.
+		"""
+		for node in self.clusterNodes.pop(cluster, ()):
+			del self.paths[node]
+		nodes = self.getNodes(cluster)
+		self.clusterNodes[cluster] = nodes
+		grid = self.getGrid(cluster)
+		for node in nodes:
+			self.paths[node] = {}
+		# Moves between soldiers are the same both ways, so every search
+		# only looks for the nodes after its own.
+		ordered = sorted(nodes)
+		for (index, node) in enumerate(ordered):
+			targets = set(ordered[index + 1:])
+			distances = self.getDistances(node, cluster, targets, grid)
+			for (target, moves) in distances.iteritems():
+				self.paths[node][target] = moves
+				self.paths[target][node] = moves
+
+	def getGrid(self, cluster):
+		""" Return the cells of a cluster a musketeer can move into.
+
+		:param cluster: The index of the cluster.
+		:returns: A bytearray of the cluster with a border of one cell around
+			it, row after row, holding 1 for the cells a musketeer can move
+			into and 0 for the others and the border.
+
+		"""
+		board = self.board
+		columns = board.columns
+		(row, col, endRow, endCol) = self.getBounds(cluster)
+		width = endCol - col + 2
+		grid = bytearray(width)
+		for clusterRow in xrange(row, endRow):
+			start = clusterRow * columns + col
+			grid += bytearray([0]) + bytearray(
+				1 if value >= SOLDIER else 0
+				for value in board.cells[start:start + width - 2]
+			) + bytearray([0])
+		grid += bytearray(width)
+		return grid
+
+	def getDistances(self, cell, cluster, targets, grid=None):
+		""" Return the number of moves from a cell to cells of its cluster,
+		moving within the cluster only.
+
+		:param cell: The cell to start from.
+		:param cluster: The cluster of the cell.
+		:param targets: The cells to find the distance to.
+		:param grid: The getGrid of the cluster, or None to get it.
+		:returns: A dict of the targets reached and their distance.
+
+		"""
+		if grid is None:
+			grid = self.getGrid(cluster)
+		columns = self.board.columns
+		(row, col, _, endCol) = self.getBounds(cluster)
+		width = endCol - col + 2
+		# Index of a cell in the grid.
+		getLocal = lambda cell: (cell // columns - row + 1) * width \
+			+ cell % columns - col + 1
+		localTargets = dict((getLocal(target), target) for target in targets)
+		found = {}
+		if len(targets) == 0:
+			return found
+		distances = [UNVISITED] * len(grid)
+		start = getLocal(cell)
+		distances[start] = 0
+		queue = [start]
+		for current in queue:
+			if current in localTargets:
+				found[localTargets[current]] = distances[current]
+				if len(found) == len(targets):
+					break
+			distance = distances[current] + 1
+			for neighbour in (current - 1, current + width, current + 1,
+							  current - width):
+				if grid[neighbour] and distances[neighbour] == UNVISITED:
+					distances[neighbour] = distance
+					queue.append(neighbour)
+		return found
+
+	def updateCells(self, changes):
+		""" Change cells of the board and rebuild the clusters they are in.
+
+		:param changes: A list of tuples containing the [row, col] of a
+			cell and its new value.
+
+		"""
+		board = self.board
+		clusters = set()
+		for (position, value) in changes:
+			cell = board.getCell(position)
+			board.setCell(cell, value)
+			clusters.add(self.getCluster(cell))
+		# The entrances on the borders of a cluster are also the ones of the
+		# clusters next to it, which have to be linked to them again.
+		owners = set()
+		rebuilt = set()
+		for cluster in clusters:
+			owners.update(owner for (owner, _) in self.getBorders(cluster))
+			rebuilt.update(self.getNeighbourClusters(cluster))
+		for cluster in owners:
+			self.buildEntrances(cluster)
+		for cluster in rebuilt:
+			self.buildPaths(cluster)
+		for key in [key for (key, graph) in clusterGraphCache.iteritems()
+					if graph is self]:
+			del clusterGraphCache[key]
+		clusterGraphCache[getCacheKey(board, self.clusterSize)] = self
+
+	def getNeighbourClusters(self, cluster):
+		""" Return a cluster and the ones sharing a border with it.
+		"""
+		(clusterRow, clusterCol) = divmod(cluster, self.clusterColumns)
+		clusters = [cluster]
+		if clusterCol != 0:
+			clusters.append(cluster - 1)
+		if clusterCol != self.clusterColumns - 1:
+			clusters.append(cluster + 1)
+		if clusterRow != 0:
+			clusters.append(cluster - self.clusterColumns)
+		if clusterRow != self.clusterRows - 1:
+			clusters.append(cluster + self.clusterColumns)
+		return clusters
+
+	def refinePath(self, cell, target):
+		""" Return the cells of a shortest path between two cells of the same
+		cluster which stays in it, found with A*.
+
+		:param cell: The cell to start from.
+		:param target: The cell to go to.
+		:returns: The list of the cells moved through, target last.
+
+		"""
+		board = self.board
+		columns = board.columns
+		(row, col, endRow, endCol) = self.getBounds(self.getCluster(cell))
+		width = endCol - col
+		cells = bytearray()
+		for clusterRow in xrange(row, endRow):
+			start = clusterRow * columns + col
+			cells += board.cells[start:start + width]
+		# Only the target ends the search.
+		cells = cells.replace(bytearray([DIAMOND]), bytearray([SOLDIER]))
+		getLocal = lambda cell: (cell // columns - row) * width \
+			+ cell % columns - col
+		cells[getLocal(target)] = DIAMOND
+		cluster = Board(cells, endRow - row, width)
+		(_, _, path) = graphSearch(
+			cluster, [getLocal(cell)],
+			FValuePolicy(getLocal(target), BUCKET_FRONTIER), TRACE_NONE
+		)
+		return [board.getCell([position[0] + row, position[1] + col])
+				for position in path[1:]]
+
+class HierarchicalPolicy(WrappedPolicy):
+	""" A* over the cluster graph of the board on the frontier of another
+	policy.
+
+	The other policy is only offered the musketeers, the nodes of the graph
+	and the diamond, each with the number of moves to it. Its trace thus
+	holds the nodes pushed and popped, and the explored nodes are the nodes
+	of the graph expanded.
+
+	"""
+	def __init__(self, policy, diamondCell, graph=None):
+		""" Initialize the policy.
+
+		:param policy: A fresh FrontierPolicy to order the nodes on.
+		:param diamondCell: The cell of the diamond to search for.
+		:param graph: The ClusterGraph of the board to be searched, or None
+			to get it from the cache when the search starts.
+
+		"""
+		super(HierarchicalPolicy, self).__init__(policy)
+		self.diamondCell = diamondCell
+		self.graph = graph
+
+	def start(self, board, searchTrace):
+		super(HierarchicalPolicy, self).start(board, searchTrace)
+		if self.graph is None:
+			self.graph = getClusterGraph(board)
+		graph = self.graph
+		diamondCell = self.diamondCell
+		cluster = graph.getCluster(diamondCell)
+		# Number of moves from the nodes of its cluster to the diamond,
+		# which are the same both ways between soldiers.
+		self.diamondPaths = graph.getDistances(diamondCell, cluster,
+												graph.getNodes(cluster))
+		self.diamondPaths.pop(diamondCell, None)
+		self.startPaths = {}
+
+	def push(self, cells, parent, gVal):
+		if parent == UNVISITED:
+			for cell in cells:
+				self.startPaths[cell] = self.getStartPaths(cell)
+		self.policy.push(cells, parent, gVal)
+
+	def getStartPaths(self, cell):
+		""" Return the number of moves from a musketeer to the nodes of the
+		clusters of the cells next to it, and to the diamond if it is in one
+		of them.
+
+		A musketeer isn't on any entrance, since it can't be moved into, so
+		its first move can cross into another cluster.
+
+		:param cell: The cell of the musketeer.
+		:returns: A dict of the nodes reached and their distance.
+
+		"""
+		graph = self.graph
+		paths = {}
+		for neighbour in graph.board.getNeighbours(cell):
+			cluster = graph.getCluster(neighbour)
+			targets = graph.getNodes(cluster)
+			if graph.getCluster(self.diamondCell) == cluster:
+				targets.add(self.diamondCell)
+			distances = graph.getDistances(neighbour, cluster, targets)
+			for (target, moves) in distances.iteritems():
+				if target not in paths or moves + 1 < paths[target]:
+					paths[target] = moves + 1
+		return paths
+
+	def getFirstStep(self, cell, target):
+		""" Return the cell next to a musketeer its path to a node of
+		getStartPaths goes through.
+		"""
+		graph = self.graph
+		cluster = graph.getCluster(target)
+		steps = []
+		for neighbour in graph.board.getNeighbours(cell):
+			if graph.getCluster(neighbour) == cluster:
+				distances = graph.getDistances(neighbour, cluster, set([target]))
+				if target in distances:
+					steps.append((distances[target], neighbour))
+		return min(steps)[1]
+
+	def expand(self, cell, gVal):
+		graph = self.graph
+		for (target, moves) in self.startPaths.get(cell, {}).iteritems():
+			self.policy.push([target], cell, gVal + moves)
+		for (target, moves) in graph.paths.get(cell, {}).iteritems():
+			self.policy.push([target], cell, gVal + moves)
+		self.policy.push(graph.crossings.get(cell, []), cell, gVal + 1)
+		if cell in self.diamondPaths:
+			self.policy.push([self.diamondCell], cell,
+							 gVal + self.diamondPaths[cell])
+
+	def getPath(self, cell):
+		""" Return the path the search took to a cell, with the moves within
+		the clusters between its nodes filled in, up to the first diamond on
+		it.
+		"""
+		board = self.board
+		nodes = board.getPath(self.parents, cell)
+		cells = [board.getCell(nodes[0])]
+		for position in nodes[1:]:
+			target = board.getCell(position)
+			if len(cells) == 1:
+				cells.append(self.getFirstStep(cells[0], target))
+				if cells[-1] == target:
+					continue
+			if target in self.graph.crossings.get(cells[-1], ()):
+				cells.append(target)
+			else:
+				cells.extend(self.graph.refinePath(cells[-1], target))
+		path = []
+		for cell in cells:
+			path.append(board.getPosition(cell))
+			if board.cells[cell] == DIAMOND:
+				break
+		return path
+
+def getCacheKey(board, clusterSize):
+	""" Return the key of the cluster graph of a board in the cache.
+	"""
+	return (board.getKey(), clusterSize)
+
+def getClusterGraph(board, clusterSize=CLUSTER_SIZE):
+	""" Return the cluster graph of the board, building it only if the
+	board isn't in the cache already.
+
+	The cache is keyed on Board.getKey, a digest of the cells worked out
+	once per board, so it is shared by the Boards built from the same 2d
+	list and never returns the graph of a board since changed with
+	Board.setCell. A graph changed with ClusterGraph.updateCells is found
+	again under the new cells.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:param clusterSize: Number of cells a side of a cluster.
+	:returns: The ClusterGraph of the board.
+
+	"""
+	board = getBoard(board)
+	key = getCacheKey(board, clusterSize)
+	graph = clusterGraphCache.pop(key, None)
+	if graph is None:
+		graph = ClusterGraph(board, clusterSize)
+	clusterGraphCache[key] = graph
+	if len(clusterGraphCache) > CLUSTER_GRAPH_CACHE_SIZE:
+		clusterGraphCache.popitem(last=False)
+	return graph
+
+def clearClusterGraphCache():
+	""" Forget the cluster graphs of all the boards queried so far.
+	"""
+	clusterGraphCache.clear()
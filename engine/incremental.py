@@ -0,0 +1,211 @@
+""" Incremental replanning with D* Lite, for boards changing a few cells at
+a time.
+
+When a soldier is captured or a musketeer moves one step, searching the
+board again from scratch redoes all the work of the last search to account
+for a handful of cells. An IncrementalPlanner keeps the state of its search
+between changes instead. It searches backwards, from the diamonds towards
+the musketeer, and keeps for every cell
+
+	g       the number of moves to a diamond found so far
+	rhs     one more than the lowest g of the cells next to it, 0 for a
+	        diamond, what g should be given its neighbours
+
+A cell whose g and rhs differ is inconsistent and queued, ordered on
+
+	[min(g, rhs) + h + km, min(g, rhs)]
+
+with h the manhattan distance to the musketeer and km the sum of the
+manhattan distances the musketeer has moved, so the keys queued before a
+move stay lower bounds of their keys after it. When cells change only they
+and the cells next to them get their rhs worked out again, and the repair
+only expands the cells whose g it actually changes, on the way between the
+changes and the musketeer, rather than the whole board.
+
+Like bfs, the path found leads to the nearest diamond.
+
+"""
+import heapq
+
+from engine.board import DIAMOND, SOLDIER, Board, getBoard
+
+# Number of moves to a diamond of the cells which can't reach one.
+NO_PATH = 2 ** 31 - 1
+
+class IncrementalPlanner(object):
+	""" D* Lite planner for the paths of one musketeer to the diamonds of a
+	changing board.
+
+	The number of cells expanded by the last call to getShortestPath or
+	updateCells is kept in self.expansions.
+
+	"""
+	def __init__(self, board, musketeerPosition):
+		""" Initialize a planner, without searching yet.
+
+		:param board: The game board, a Board or a 2d list of integers,
+			whose cells are copied so that later changes only come in
+			through updateCells.
+		:param musketeerPosition: The [row, col] of the musketeer to plan
+			for.
+
+		"""
+		super(IncrementalPlanner, self).__init__()
+		board = getBoard(board)
+		self.board = Board(bytearray(buffer(board.cells)), board.rows,
+						   board.columns)
+		self.start = self.board.getCell(musketeerPosition)
+		self.km = 0
+		self.gValues = self.board.newTable(NO_PATH)
+		self.rhsValues = self.board.newTable(NO_PATH)
+		# Heap of the keys and cells queued, and the key every inconsistent
+		# cell was last queued with. Entries whose key isn't that one any
+		# more are left in the heap and skipped when they come up.
+		self.queue = []
+		self.queuedKeys = {}
+		self.expansions = 0
+		for cell in self.board.findCells(DIAMOND):
+			self.rhsValues[cell] = 0
+			self.push(cell)
+
+	def getHeuristicValue(self, cell):
+		""" Return the manhattan distance from the musketeer to a cell.
+		"""
+		return self.board.getDistance(self.start, cell)
+
+	def getKey(self, cell):
+		""" Return the key a cell is ordered on in the queue.
+		"""
+		value = min(self.gValues[cell], self.rhsValues[cell])
+		if value == NO_PATH:
+			return (NO_PATH, NO_PATH)
+		return (value + self.getHeuristicValue(cell) + self.km, value)
+
+	def push(self, cell):
+		""" Queue a cell with its current key.
+		"""
+		key = self.getKey(cell)
+		self.queuedKeys[cell] = key
+		heapq.heappush(self.queue, (key, cell))
+
+	def getTopKey(self):
+		""" Return the lowest key queued, dropping the entries left behind
+		on top of it, or None if the queue is empty.
+		"""
+		queue = self.queue
+		while len(queue) != 0:
+			(key, cell) = queue[0]
+			if self.queuedKeys.get(cell) == key:
+				return key
+			heapq.heappop(queue)
+		return None
+
+	def getRhsValue(self, cell):
+		""" Return what the g value of a cell should be given the g values of
+		the cells next to it.
+		"""
+		cells = self.board.cells
+		if cells[cell] == DIAMOND:
+			return 0
+		if cells[cell] < SOLDIER and cell != self.start:
+			# Can't be moved into, and isn't where the musketeer starts.
+			return NO_PATH
+		gValues = self.gValues
+		value = NO_PATH
+		for neighbour in self.board.getNeighbours(cell):
+			if gValues[neighbour] < value:
+				value = gValues[neighbour]
+		return value + 1 if value != NO_PATH else NO_PATH
+
+	def updateCell(self, cell):
+		""" Work out the rhs value of a cell again and queue it if it is left
+		inconsistent, or take it off the queue if not.
+		"""
+		self.rhsValues[cell] = self.getRhsValue(cell)
+		if self.gValues[cell] != self.rhsValues[cell]:
+			self.push(cell)
+		else:
+			self.queuedKeys.pop(cell, None)
+
+	def computeShortestPath(self):
+		""" Expand the inconsistent cells until the g value of the musketeer
+		is the number of moves of its shortest path to a diamond.
+		"""
+		gValues = self.gValues
+		rhsValues = self.rhsValues
+		getAdjacent = self.board.getAdjacent
+		start = self.start
+		self.expansions = 0
+		while True:
+			topKey = self.getTopKey()
+			if topKey is None or (topKey >= self.getKey(start)
+								  and gValues[start] == rhsValues[start]):
+				break
+			(_, cell) = heapq.heappop(self.queue)
+			key = self.getKey(cell)
+			if topKey < key:
+				# Queued before the musketeer moved or the cell changed.
+				self.push(cell)
+				continue
+			del self.queuedKeys[cell]
+			self.expansions += 1
+			if gValues[cell] > rhsValues[cell]:
+				gValues[cell] = rhsValues[cell]
+			else:
+				gValues[cell] = NO_PATH
+				self.updateCell(cell)
+			for neighbour in getAdjacent(cell):
+				self.updateCell(neighbour)
+
+	def getShortestPath(self):
+		""" Return the shortest path from the musketeer to a diamond,
+		repairing the search first if needed.
+
+		:returns: A list of the [row, col] on the path, from the musketeer
+			to the diamond, or an empty list if it can't reach one.
+
+		"""
+		self.computeShortestPath()
+		board = self.board
+		gValues = self.gValues
+		cell = self.start
+		if gValues[cell] == NO_PATH:
+			return []
+		shortestPath = [board.getPosition(cell)]
+		while gValues[cell] != 0:
+			# Down onto a neighbour one move closer to a diamond.
+			cell = min(board.getNeighbours(cell), key=gValues.__getitem__)
+			shortestPath.append(board.getPosition(cell))
+		return shortestPath
+
+	def updateCells(self, changes, musketeerPosition=None):
+		""" Change cells of the board and return the new shortest path.
+
+		:param changes: A list of tuples containing the [row, col] of a
+			cell and its new value, like a soldier captured becoming EMPTY.
+		:param musketeerPosition: The new [row, col] of the musketeer if it
+			moved, or None. The cells it left and moved into should be in
+			changes as well.
+		:returns: What getShortestPath returns.
+
+		"""
+		board = self.board
+		changed = set()
+		for (position, value) in changes:
+			cell = board.getCell(position)
+			board.cells[cell] = value
+			changed.add(cell)
+		if musketeerPosition is not None:
+			cell = board.getCell(musketeerPosition)
+			self.km += self.getHeuristicValue(cell)
+			changed.update([self.start, cell])
+			self.start = cell
+
+		# Moving into a cell is moving along the edges to it, so the cells
+		# next to a changed one get their rhs value worked out again too.
+		cells = set(changed)
+		for cell in changed:
+			cells.update(board.getAdjacent(cell))
+		for cell in cells:
+			self.updateCell(cell)
+		return self.getShortestPath()
@@ -0,0 +1,145 @@
+""" Jump point search on the grid of the board.
+
+A musketeer moves left, down, right or up into a soldier, every move
+costing the same, so there are usually many shortest paths between two
+cells which only differ in the order of their moves. Jump point search
+only follows one of them, the canonical one, which moves horizontally as
+early as it can and only turns from a vertical move to a horizontal one
+when an obstacle forces it to. Going on from a cell reached moving
+
+	horizontally    it keeps going that way or turns up or down
+	vertically      it keeps going that way, or turns to a side when the
+	                cell beside the one it came from is blocked, a
+	                forced neighbour
+
+Rather than pushing every cell it reaches, the search runs along each of
+those directions and only pushes the first cell worth stopping at, a jump
+point: the diamond, a cell with a forced neighbour when going vertically,
+or when going horizontally a cell from which going up or down finds one.
+The path is still a shortest one, and the straight runs between its jump
+points are filled back in when it is returned.
+
+"""
+from engine.board import DIAMOND, SOLDIER, UNVISITED
+from engine.search import WrappedPolicy
+
+class JumpPointPolicy(WrappedPolicy):
+	""" Jump point search over the frontier of another policy.
+
+	The other policy is only offered jump points, each with the number of
+	moves to it. Its trace thus holds the jump points pushed and popped,
+	and the explored nodes are the jump points expanded.
+
+	"""
+	def expand(self, cell, gVal):
+		board = self.board
+		columns = board.columns
+		parent = self.parents[cell]
+		# Steps to go on with, each with whether it moves vertically. On a
+		# board of one column 1 is a vertical step too, so that can't be
+		# told from the step alone.
+		if parent == UNVISITED:
+			# A musketeer, any way goes.
+			steps = [(-1, False), (columns, True), (1, False),
+					 (-columns, True)]
+		elif cell // columns == parent // columns:
+			# Horizontally, on to the next cell or up or down.
+			step = 1 if cell > parent else -1
+			steps = [(step, False), (columns, True), (-columns, True)]
+		else:
+			# Vertically, on to the next cell or to a forced neighbour.
+			step = columns if cell > parent else -columns
+			steps = [(step, True)] + [
+				(forcedStep, False)
+				for forcedStep in self.getForcedSteps(cell, step)
+			]
+
+		for (step, vertical) in steps:
+			if vertical:
+				jumpPoint = self.jumpVertically(cell, step)
+			else:
+				jumpPoint = self.jumpHorizontally(cell, step)
+			if jumpPoint is not None:
+				self.policy.push([jumpPoint], cell,
+								 gVal + board.getDistance(cell, jumpPoint))
+
+	def getForcedSteps(self, cell, step):
+		""" Return the steps to the forced neighbours of a cell.
+
+		:param cell: The cell reached moving vertically.
+		:param step: The vertical step it was reached with, columns for
+			down or -columns for up.
+		:returns: A list of -1 if the cell to the left is a forced
+			neighbour, 1 if the one to the right is, in that order.
+
+		"""
+		cells = self.board.cells
+		columns = self.board.columns
+		col = cell % columns
+		previous = cell - step
+		forced = []
+		if col != 0 and cells[cell - 1] >= SOLDIER \
+		and cells[previous - 1] < SOLDIER:
+			forced.append(-1)
+		if col != columns - 1 and cells[cell + 1] >= SOLDIER \
+		and cells[previous + 1] < SOLDIER:
+			forced.append(1)
+		return forced
+
+	def jumpVertically(self, cell, step):
+		""" Go up or down from a cell until a jump point.
+
+		:param cell: The cell to start from.
+		:param step: columns to go down or -columns to go up.
+		:returns: The first cell on the way which is the diamond or has a
+			forced neighbour, or None if the way is blocked before.
+
+		"""
+		cells = self.board.cells
+		size = self.board.size
+		cell += step
+		while 0 <= cell < size and cells[cell] >= SOLDIER:
+			if cells[cell] == DIAMOND or self.getForcedSteps(cell, step):
+				return cell
+			cell += step
+		return None
+
+	def jumpHorizontally(self, cell, step):
+		""" Go left or right from a cell until a jump point.
+
+		:param cell: The cell to start from.
+		:param step: -1 to go left or 1 to go right.
+		:returns: The first cell on the way which is the diamond or from
+			which going up or down finds a jump point, or None if the way is
+			blocked before.
+
+		"""
+		cells = self.board.cells
+		columns = self.board.columns
+		# Column of the last cell of the row in the way.
+		lastCol = columns - 1 if step == 1 else 0
+		while cell % columns != lastCol:
+			cell += step
+			if cells[cell] < SOLDIER:
+				return None
+			if cells[cell] == DIAMOND \
+			or self.jumpVertically(cell, columns) is not None \
+			or self.jumpVertically(cell, -columns) is not None:
+				return cell
+		return None
+
+	def getPath(self, cell):
+		""" Return the path the search took to a cell, with the cells
+		between its jump points filled in.
+		"""
+		jumpPoints = self.board.getPath(self.parents, cell)
+		path = jumpPoints[:1]
+		for (row, col) in jumpPoints[1:]:
+			(lastRow, lastCol) = path[-1]
+			rowStep = cmp(row, lastRow)
+			colStep = cmp(col, lastCol)
+			while lastRow != row or lastCol != col:
+				lastRow += rowStep
+				lastCol += colStep
+				path.append([lastRow, lastCol])
+		return path
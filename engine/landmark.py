@@ -0,0 +1,258 @@
+""" Landmark (ALT) heuristic, from exact distances to a few landmark cells.
+
+The manhattan distance knows nothing of the empty cells a path has to go
+around, so on boards like mazes it is far below the number of moves left
+and A* and IDA* expand nearly every cell. A LandmarkTable holds the number
+of moves from a handful of landmarks to every cell, from one bfs each.
+Moves between soldiers are the same both ways, so by the triangle
+inequality no path from a cell to the diamond is shorter than
+
+	|d(L, cell) - d(L, diamond)|
+
+for any landmark L, and the heuristic value is the largest of those and
+the manhattan distance, which is still admissible and consistent. The
+landmarks are picked far apart, each the cell farthest from the ones
+picked before, so that the paths towards or away from one of them are
+long.
+
+Tables are built the first time a board is searched with them and cached,
+and can be written next to the board file, so that later runs load them
+instead of building them again. A table file is a fixed size header
+followed by the landmarks and their distances:
+
+	magic       4 bytes, LANDMARK_MAGIC
+	version     1 byte, LANDMARK_VERSION
+	landmarks   1 byte, number of landmarks
+	            2 bytes of padding
+	rows        8 bytes
+	columns     8 bytes
+	checksum    4 bytes, crc32 of the cells of the board
+	            4 bytes of padding
+	landmark    8 bytes for the cell of every landmark
+	distances   4 bytes for every cell, -1 for the ones the landmark
+	            can't reach, row after row, for every landmark in turn
+
+with every number little endian.
+
+"""
+import collections
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from engine.board import DIAMOND, SOLDIER, UNVISITED, InvalidBoard, getBoard
+from engine.search import getHeuristicValue
+
+# Number of landmarks picked on a board.
+LANDMARK_COUNT = 4
+
+LANDMARK_MAGIC = 'MSKL'
+LANDMARK_VERSION = 1
+LANDMARK_HEADER = struct.Struct('<4sBBxxQQI4x')
+# Appended to the path of a board file for the path of its table.
+LANDMARK_SUFFIX = '.landmarks'
+
+# Maximum number of boards whose landmark table is kept around.
+LANDMARK_TABLE_CACHE_SIZE = 8
+# Landmark tables of the most recently queried boards keyed on Board.getKey.
+landmarkTableCache = collections.OrderedDict()
+
+class LandmarkTable(object):
+	""" Distances from the landmarks of a board to every cell.
+	"""
+	def __init__(self, landmarks, tables):
+		""" Initialize a table.
+
+		:param landmarks: The cells of the landmarks.
+		:param tables: For every landmark, a table of the number of moves
+			from it to every cell, UNVISITED for the cells it can't reach.
+
+		"""
+		super(LandmarkTable, self).__init__()
+		self.landmarks = landmarks
+		self.tables = tables
+
+	@classmethod
+	def build(cls, board, count=LANDMARK_COUNT):
+		""" Pick the landmarks of a board and find the distances from them.
+
+		:param board: The game board as a Board.
+		:param count: Number of landmarks to pick, fewer if the board has
+			fewer soldiers and diamonds.
+		:returns: The LandmarkTable.
+
+		"""
+		cells = board.cells
+		# From a diamond if there is one, so that the landmarks are picked
+		# in the region of the board searched.
+		start = next(iter(board.findCells(DIAMOND)), None)
+		if start is None:
+			start = next((cell for cell in xrange(board.size)
+						  if cells[cell] >= SOLDIER), None)
+		landmarks = []
+		tables = []
+		if start is None:
+			return cls(landmarks, tables)
+
+		# The first landmark is the cell farthest from that one, every next
+		# one the cell farthest from the closest landmark so far.
+		closest = getDistances(board, start)
+		while len(landmarks) < count:
+			landmark = max(xrange(board.size), key=closest.__getitem__)
+			if closest[landmark] <= 0:
+				break
+			distances = getDistances(board, landmark)
+			landmarks.append(landmark)
+			tables.append(distances)
+			closest = array('i', [
+				min(nearest, distance)
+				for (nearest, distance) in zip(closest, distances)
+			])
+		return cls(landmarks, tables)
+
+	def getHeuristicValue(self, board, cell, diamondCell):
+		""" Return the heuristic value of a cell, a lower bound on the
+		number of moves from it to the diamond.
+
+		Takes the same arguments as engine.search.getHeuristicValue, so it
+		can be given to the policies in its place.
+
+		"""
+		value = getHeuristicValue(board, cell, diamondCell)
+		for distances in self.tables:
+			distance = distances[cell]
+			diamondDistance = distances[diamondCell]
+			if distance != UNVISITED and diamondDistance != UNVISITED \
+			and abs(distance - diamondDistance) > value:
+				value = abs(distance - diamondDistance)
+		return value
+
+def getDistances(board, cell):
+	""" Return the number of moves from a cell to every cell of the board
+	a musketeer can move into.
+
+	:param board: The game board as a Board.
+	:param cell: A cell holding a soldier or a diamond.
+	:returns: A table of the distance to every cell reached and UNVISITED
+		for the others.
+
+	"""
+	distances = board.newTable()
+	distances[cell] = 0
+	searchQueue = [cell]
+	for current in searchQueue:
+		distance = distances[current] + 1
+		for neighbour in board.getNeighbours(current):
+			if distances[neighbour] == UNVISITED:
+				distances[neighbour] = distance
+				searchQueue.append(neighbour)
+	return distances
+
+def getChecksum(board):
+	""" Return the crc32 of the cells of a board.
+	"""
+	return zlib.crc32(buffer(board.cells)) & 0xffffffff
+
+def writeLandmarkTable(table, board, path):
+	""" Write the landmark table of a board to a file.
+
+	:param table: The LandmarkTable.
+	:param board: The game board, a Board or a 2d list of integers, the
+		table was built for.
+	:param path: Path of the file to write.
+
+	"""
+	board = getBoard(board)
+	with open(path, 'wb') as tableFile:
+		tableFile.write(LANDMARK_HEADER.pack(
+			LANDMARK_MAGIC, LANDMARK_VERSION, len(table.landmarks),
+			board.rows, board.columns, getChecksum(board)
+		))
+		tableFile.write(struct.pack('<%dq' % len(table.landmarks),
+									*table.landmarks))
+		for distances in table.tables:
+			if sys.byteorder == 'big':
+				distances = array('i', distances)
+				distances.byteswap()
+			distances.tofile(tableFile)
+
+def readLandmarkTable(board, path):
+	""" Read the landmark table of a board from a file.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:param path: Path of the file to read.
+	:returns: The LandmarkTable.
+	:raises InvalidBoard: If the file isn't a landmark table of this
+		version, it's cut short or it was written for another board.
+
+	"""
+	board = getBoard(board)
+	with open(path, 'rb') as tableFile:
+		header = tableFile.read(LANDMARK_HEADER.size)
+		if len(header) < LANDMARK_HEADER.size:
+			raise InvalidBoard('%s: not a landmark table' % path)
+		(magic, version, count, rows, columns, checksum) = \
+			LANDMARK_HEADER.unpack(header)
+		if magic != LANDMARK_MAGIC or version != LANDMARK_VERSION:
+			raise InvalidBoard('%s: not a landmark table' % path)
+		if (rows, columns, checksum) != \
+		(board.rows, board.columns, getChecksum(board)):
+			raise InvalidBoard('%s: landmark table of another board' % path)
+
+		try:
+			landmarks = list(struct.unpack('<%dq' % count,
+										   tableFile.read(8 * count)))
+			tables = []
+			for _ in xrange(count):
+				distances = array('i')
+				distances.fromfile(tableFile, board.size)
+				if sys.byteorder == 'big':
+					distances.byteswap()
+				tables.append(distances)
+		except (struct.error, EOFError):
+			raise InvalidBoard('%s: landmark table cut short' % path)
+	return LandmarkTable(landmarks, tables)
+
+def getLandmarkTable(board, boardPath=None):
+	""" Return the landmark table of the board, building it only if the
+	board isn't in the cache already.
+
+	The cache is keyed on Board.getKey, a digest of the cells worked out
+	once per board, so it is shared by the Boards built from the same 2d
+	list and never returns the table of a board since changed with
+	Board.setCell.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:param boardPath: Path of the file of the board, or None. If given, the
+		table is read from the file next to it, boardPath + LANDMARK_SUFFIX,
+		rather than built, or written there once built if that file is
+		missing or doesn't hold the table of the board.
+	:returns: The LandmarkTable of the board.
+
+	"""
+	board = getBoard(board)
+	key = board.getKey()
+	table = landmarkTableCache.pop(key, None)
+	if table is None and boardPath is not None:
+		tablePath = boardPath + LANDMARK_SUFFIX
+		if os.path.exists(tablePath):
+			try:
+				table = readLandmarkTable(board, tablePath)
+			except InvalidBoard:
+				pass
+		if table is None:
+			table = LandmarkTable.build(board)
+			writeLandmarkTable(table, board, tablePath)
+	elif table is None:
+		table = LandmarkTable.build(board)
+	landmarkTableCache[key] = table
+	if len(landmarkTableCache) > LANDMARK_TABLE_CACHE_SIZE:
+		landmarkTableCache.popitem(last=False)
+	return table
+
+def clearLandmarkTableCache():
+	""" Forget the landmark tables of all the boards queried so far.
+	"""
+	landmarkTableCache.clear()
@@ -0,0 +1,151 @@
+""" Running the search from every musketeer in its own worker process.
+"""
+import cPickle
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from engine.trace import getResultPath
+
+# The board every worker process searches, set once when the process starts
+# so it isn't sent along with every search.
+workerBoard = None
+
+def initWorker(board):
+	""" Keep the board a worker process of the pool searches.
+	"""
+	global workerBoard
+	workerBoard = board
+
+def runSearch(task):
+	""" Run the search from one musketeer in a worker process.
+
+	The result is written to a file rather than returned, see
+	searchMusketeers.
+
+	:param task: A tuple containing the index of the musketeer, the search
+		function, the musketeer's [row, col], the other arguments to the
+		search and the folder to write the result to.
+	:returns: The index of the musketeer, the name of its result file in
+		the folder.
+
+	"""
+	(index, search, musketeerPosition, args, folder) = task
+	result = search(workerBoard, musketeerPosition, *args)
+	with open(os.path.join(folder, str(index)), 'wb') as resultFile:
+		cPickle.dump(result, resultFile, cPickle.HIGHEST_PROTOCOL)
+	return index
+
+def readResult(folder, index):
+	""" Return the result a worker process wrote with runSearch.
+	"""
+	with open(os.path.join(folder, str(index)), 'rb') as resultFile:
+		return cPickle.load(resultFile)
+
+def getProvenWinner(lengths, lowerBounds):
+	""" Return the musketeer the sequential search would pick, if the
+	searches done so far are enough to tell.
+
+	The sequential search keeps the first of the shortest paths in the order
+	of the musketeers, so a musketeer wins once every musketeer before it is
+	done without a shorter path and no musketeer after it can find a
+	shorter one, either because it is done or because its lower bound
+	isn't below the length of the path.
+
+	:param lengths: For every musketeer, the number of moves of the path its
+		search found, -1 if it found none, or None if it isn't done.
+	:param lowerBounds: For every musketeer, a lower bound on the number of
+		moves of any path from it.
+	:returns: The index of the winning musketeer, or None if it can't be
+		told yet or none of them has a path.
+
+	"""
+	winner = None
+	for (index, length) in enumerate(lengths):
+		if length is None:
+			if winner is None:
+				return None
+			if lowerBounds[index] < lengths[winner]:
+				return None
+		elif length != -1 and (winner is None or length < lengths[winner]):
+			winner = index
+	return winner
+
+def searchMusketeers(search, board, musketeerPositions, lowerBounds, args=(),
+					 processes=None):
+	""" Search from every musketeer at once in a pool of worker processes.
+
+	Every worker gets the board once when it starts, which with fork shares
+	the pages of the board, or of the file a MappedBoard is mapped from,
+	instead of copying them. The searches then run without a bound on the
+	path and as soon as the path found by one of them is proven to be the
+	one the sequential search would pick, the searches still running are
+	cancelled by terminating the pool.
+
+	The workers hand their results back through files in a temporary
+	folder and only send the pool their index. Pool.terminate puts a
+	message through the pipe the results come back on, under a lock the
+	workers hold while sending, so a worker stuck sending a result too big
+	for the pipe once the pool stops reading it would hang terminate.
+
+	The result is the same as running the searches one after another with
+	the length of the shortest path so far as their upperBound: the path of
+	the winning musketeer doesn't depend on the bound, and if the sequential
+	search would have bounded its search the winner is searched again here
+	with that bound, so what it recorded matches as well.
+
+	:param search: A module level function which finds a shortest path from
+		a musketeer, called as search(board, musketeerPosition, *args,
+		upperBound=upperBound) and returning what getSearchResult does.
+	:param board: The game board, a Board.
+	:param musketeerPositions: The [row, col] of every musketeer, in the
+		order the sequential search would go through them.
+	:param lowerBounds: For every musketeer, a lower bound on the number of
+		moves of any path from it, like the manhattan distance to the
+		diamond.
+	:param args: The arguments to search after the musketeer's position.
+	:param processes: Number of worker processes, by default one per
+		musketeer up to the number of CPUs.
+	:returns: The result of the search of the musketeer with the shortest
+		path, the first one of them in order, or of the last musketeer if
+		none of them has a path.
+
+	"""
+	if processes is None:
+		processes = min(len(musketeerPositions), multiprocessing.cpu_count())
+	folder = tempfile.mkdtemp(prefix='musketeers')
+	tasks = [
+		(index, search, musketeerPosition, args, folder)
+		for (index, musketeerPosition) in enumerate(musketeerPositions)
+	]
+	results = [None] * len(musketeerPositions)
+	lengths = [None] * len(musketeerPositions)
+
+	try:
+		pool = multiprocessing.Pool(processes, initWorker, (board,))
+		try:
+			winner = None
+			for index in pool.imap_unordered(runSearch, tasks):
+				results[index] = readResult(folder, index)
+				lengths[index] = len(getResultPath(results[index])) - 1
+				winner = getProvenWinner(lengths, lowerBounds)
+				if winner is not None:
+					break
+		finally:
+			pool.terminate()
+			pool.join()
+	finally:
+		shutil.rmtree(folder, ignore_errors=True)
+
+	if winner is None:
+		return results[-1]
+
+	# Every search before the winner is done, the sequential search would
+	# have bounded the winner's on the shortest of their paths.
+	upperBound = min([length for length in lengths[:winner] if length != -1]
+					 or [None])
+	if upperBound is None:
+		return results[winner]
+	return search(board, musketeerPositions[winner], *args,
+				  upperBound=upperBound)
@@ -0,0 +1,172 @@
+""" Regions of the board, the cells no path to a diamond can go through.
+
+A musketeer moves through the connected component of soldiers and
+diamonds next to it and can only ever reach the diamonds in it. Labelling
+the components of the board once tells for every musketeer in O(1),
+from the labels of the cells next to it, whether any search from it can
+find a path, so the searches of the ones which can't are skipped instead
+of exploring their whole region.
+
+Within the components left, a path through a dead end soldier, one with
+a single neighbour, would have to leave it the way it came, so no path to
+a diamond goes through it unless it starts there. Peeling dead ends off
+over and over empties whole cul-de-sacs, which the searches then never
+expand.
+
+The regions of a board are worked out the first time it is pruned and
+cached, so repeated searches on the same board reuse them.
+
+"""
+import collections
+
+from engine.board import (
+	DIAMOND, EMPTY, MUSKETEER, SOLDIER, UNVISITED, Board, getBoard
+)
+
+# Maximum number of boards whose regions are kept around.
+BOARD_REGION_CACHE_SIZE = 8
+# Regions of the most recently queried boards keyed on Board.getKey.
+boardRegionCache = collections.OrderedDict()
+
+class BoardRegions(object):
+	""" The connected components of a board and the cells worth searching.
+	"""
+	def __init__(self, board):
+		""" Label the components of a board.
+
+		:param board: The game board as a Board.
+
+		"""
+		super(BoardRegions, self).__init__()
+		self.board = board
+		# Component of every soldier and diamond, UNVISITED for the rest.
+		self.labels = self.labelComponents()
+		self.diamondLabels = set(
+			self.labels[cell] for cell in board.findCells(DIAMOND)
+		)
+		self.prunedBoard = None
+
+	def labelComponents(self):
+		""" Return a table of the component of every cell a musketeer can
+		move into, numbered from 0, and UNVISITED for the others.
+		"""
+		board = self.board
+		cells = board.cells
+		labels = board.newTable()
+		label = 0
+		for cell in xrange(board.size):
+			if cells[cell] < SOLDIER or labels[cell] != UNVISITED:
+				continue
+			labels[cell] = label
+			component = [cell]
+			for member in component:
+				for neighbour in board.getNeighbours(member):
+					if labels[neighbour] == UNVISITED:
+						labels[neighbour] = label
+						component.append(neighbour)
+			label += 1
+		return labels
+
+	def canReachDiamond(self, cell):
+		""" Return whether a musketeer can reach a diamond from a cell.
+
+		:param cell: The cell of the musketeer.
+		:returns: True if a cell it can move into is in the component of a
+			diamond.
+
+		"""
+		labels = self.labels
+		diamondLabels = self.diamondLabels
+		for neighbour in self.board.getNeighbours(cell):
+			if labels[neighbour] in diamondLabels:
+				return True
+		return False
+
+	def getPrunedBoard(self):
+		""" Return a copy of the board in which the soldiers no shortest path
+		from a musketeer to a diamond can go through are empty: those out of
+		the components of the diamonds, and the dead ends peeled off.
+		"""
+		if self.prunedBoard is not None:
+			return self.prunedBoard
+
+		board = self.board
+		cells = bytearray(buffer(board.cells))
+		labels = self.labels
+		diamondLabels = self.diamondLabels
+		for cell in xrange(board.size):
+			if cells[cell] == SOLDIER and labels[cell] not in diamondLabels:
+				cells[cell] = EMPTY
+
+		# A musketeer may have to start through a dead end, so the cells
+		# next to one are kept.
+		starts = set()
+		for cell in board.findCells(MUSKETEER):
+			starts.update(board.getNeighbours(cell))
+		pruned = Board(cells, board.rows, board.columns)
+		deadEnds = [
+			cell for cell in xrange(board.size)
+			if cells[cell] == SOLDIER and cell not in starts
+			and len(pruned.getNeighbours(cell)) <= 1
+		]
+		for cell in deadEnds:
+			if cells[cell] != SOLDIER:
+				continue
+			neighbours = pruned.getNeighbours(cell)
+			cells[cell] = EMPTY
+			# Emptying it may leave its neighbour a dead end as well.
+			for neighbour in neighbours:
+				if cells[neighbour] == SOLDIER and neighbour not in starts \
+				and len(pruned.getNeighbours(neighbour)) <= 1:
+					deadEnds.append(neighbour)
+
+		self.prunedBoard = pruned
+		return pruned
+
+def pruneBoard(board, musketeerPositions):
+	""" Return the pruned board and the musketeers which can reach a
+	diamond on it.
+
+	:param board: The game board as a Board.
+	:param musketeerPositions: The [row, col] of every musketeer.
+	:returns: A tuple containing the Board of BoardRegions.getPrunedBoard
+		and the [row, col] of the musketeers with a path to a diamond, in the
+		same order. If there are none, board is returned as it is.
+
+	"""
+	regions = getBoardRegions(board)
+	musketeerPositions = [
+		position for position in musketeerPositions
+		if regions.canReachDiamond(board.getCell(position))
+	]
+	if len(musketeerPositions) == 0:
+		return (board, musketeerPositions)
+	return (regions.getPrunedBoard(), musketeerPositions)
+
+def getBoardRegions(board):
+	""" Return the regions of the board, labelling them only if the board
+	isn't in the cache already.
+
+	The cache is keyed on Board.getKey, a digest of the cells worked out
+	once per board, so it is shared by the Boards built from the same 2d
+	list and never returns the regions of a board since changed with
+	Board.setCell.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:returns: The BoardRegions of the board.
+
+	"""
+	board = getBoard(board)
+	key = board.getKey()
+	regions = boardRegionCache.pop(key, None)
+	if regions is None:
+		regions = BoardRegions(board)
+	boardRegionCache[key] = regions
+	if len(boardRegionCache) > BOARD_REGION_CACHE_SIZE:
+		boardRegionCache.popitem(last=False)
+	return regions
+
+def clearBoardRegionCache():
+	""" Forget the regions of all the boards queried so far.
+	"""
+	boardRegionCache.clear()
@@ -0,0 +1,860 @@
+""" The search loop shared by all the algorithms.
+
+Every algorithm is the same loop over a frontier: pop a node, stop if it
+holds the diamond, else offer the frontier every neighbour the musketeer
+can move into. What sets the algorithms apart is which of those the
+frontier takes and the order it gives them back in, which is left to a
+frontier policy:
+
+	FifoPolicy          bfs
+	LifoPolicy          dfs
+	HeuristicPolicy     best first search, ordered on the heuristic value
+	FValuePolicy        A*, ordered on the f value
+	BoundedDfsPolicy    IDA*, dfs cut off at a bound on f
+	FringePolicy        fringe search, IDA* resuming from its frontier
+
+A WrappedPolicy changes what a node leads to but leaves the frontier to
+one of those: engine.jump.JumpPointPolicy expands jump points instead of
+every cell, and engine.corridor.CorridorPolicy the ends of the corridors
+of a CorridorGraph.
+
+bidirectionalBfsSearch runs two bfs at once, from the musketeers and back
+from the diamond, so it keeps its own loop.
+
+"""
+import collections
+
+from engine.board import DIAMOND, MUSKETEER, SOLDIER, UNVISITED, getBoard
+from engine.frontier import ORDERED_FRONTIER, getFrontier
+from engine.trace import (
+	SearchTrace, TRACE_EXPLORED, TRACE_FULL, getResultPath, getSearchResult,
+	getTraceLevel
+)
+
+# Which search of a bidirectional bfs reached a cell.
+FORWARD = 1
+BACKWARD = 2
+
+def graphSearch(board, startCells, policy, trace=TRACE_FULL):
+	""" Search the board from the given cells until a diamond is popped.
+
+	:param board: The game board as a Board.
+	:param startCells: The cells of the musketeers to search from, offered
+		to the frontier in order with a g value of 0.
+	:param policy: A FrontierPolicy deciding the order of the search, a
+		fresh one but for a BoundedDfsPolicy, which carries over from the
+		previous iteration of IDA*.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:returns: A tuple containing exploredNodes, searchQueue, shortestPath.
+		searchQueue is a SearchTrace of the queue in every iteration.
+		exploredNodes and searchQueue are None when not recorded.
+
+	"""
+	trace = getTraceLevel(trace)
+	traceExplored = trace >= TRACE_EXPLORED
+	traceQueue = trace == TRACE_FULL
+	cells = board.cells
+	shortestPath = []
+	exploredNodes = [] if traceExplored else None
+	# Pushes and pops done on the frontier in each iteration.
+	iterativeSearchQueue = SearchTrace() if traceQueue else None
+	policy.start(board, iterativeSearchQueue)
+	goalFound = False
+
+	policy.push(startCells, UNVISITED, 0)
+	pop = policy.pop
+	expand = policy.expand
+	while len(policy.queue) != 0:
+		node = pop()
+		if node is None:
+			# Nothing to expand, the policy dropped what it popped.
+			continue
+		(cell, gVal) = node
+		if traceExplored:
+			exploredNodes.append(board.getPosition(cell))
+		if cells[cell] == DIAMOND:
+			# Diamong found! End this iteration with the remaining queue
+			# and break.
+			goalFound = True
+			if traceQueue:
+				iterativeSearchQueue.endIteration()
+			break
+		expand(cell, gVal)
+
+		if traceQueue:
+			iterativeSearchQueue.endIteration()
+
+	if goalFound:
+		shortestPath = policy.getPath(cell)
+	return (exploredNodes, iterativeSearchQueue, shortestPath)
+
+class FrontierPolicy(object):
+	""" The frontier of a search and the rules for what goes into it.
+
+	A policy is used for a single search, except for BoundedDfsPolicy
+	which runs every iteration of IDA*. It keeps its frontier in
+	self.queue, which the search runs until it is empty, and the table of
+	the cell every cell was reached from, which the path is backtraced
+	from. Every push and pop is recorded on the SearchTrace of the search
+	if there is one.
+
+	"""
+	def start(self, board, searchTrace):
+		""" Get ready for a search.
+
+		:param board: The game board as a Board.
+		:param searchTrace: The SearchTrace to record the frontier on, or
+			None.
+
+		"""
+		self.board = board
+		self.searchTrace = searchTrace
+		self.parents = board.newTable()
+
+	def push(self, cells, parent, gVal):
+		""" Offer the frontier cells reached from the same cell, which it
+		takes or drops one by one, in order.
+
+		:param cells: The cells reached.
+		:param parent: The cell they were reached from, UNVISITED for the
+			cells the search starts from.
+		:param gVal: The number of moves they were reached in.
+
+		"""
+		raise NotImplementedError
+
+	def pop(self):
+		""" Take the next node to expand off the frontier.
+
+		:returns: A tuple containing the cell and its g value, or None if
+			what came off the frontier isn't to be expanded.
+
+		"""
+		raise NotImplementedError
+
+	def expand(self, cell, gVal):
+		""" Offer the frontier the cells a node leads to, by default its
+		neighbours one move away.
+
+		:param cell: The cell of the node.
+		:param gVal: The number of moves the node was reached in.
+
+		"""
+		self.push(self.board.getNeighbours(cell), cell, gVal + 1)
+
+	def getPath(self, cell):
+		""" Return the path the search took to a cell, a list of its
+		[row, col] from a musketeer to the cell.
+		"""
+		return self.board.getPath(self.parents, cell)
+
+class FifoPolicy(FrontierPolicy):
+	""" First in first out, for bfs. Every cell is taken the first time it
+	is reached.
+	"""
+	def __init__(self, upperBound=None):
+		""" Initialize the policy.
+
+		:param upperBound: Only look for paths of fewer moves than this, or
+			for any path if None. Nodes whose g value reaches it aren't
+			taken.
+
+		"""
+		super(FifoPolicy, self).__init__()
+		self.upperBound = upperBound
+
+	def start(self, board, searchTrace):
+		super(FifoPolicy, self).start(board, searchTrace)
+		self.queue = collections.deque()
+		# Number of moves to every cell reached, only kept to prune against
+		# upperBound.
+		self.depths = board.newTable() if self.upperBound is not None else None
+
+	def push(self, cells, parent, gVal):
+		if self.depths is not None and gVal >= self.upperBound:
+			# No path through here can be shorter than the bound.
+			return
+		parents = self.parents
+		depths = self.depths
+		queue = self.queue
+		searchTrace = self.searchTrace
+		for cell in cells:
+			if parents[cell] != UNVISITED:
+				continue
+			parents[cell] = parent
+			if depths is not None:
+				depths[cell] = gVal
+			queue.append(cell)
+			if searchTrace is not None:
+				searchTrace.push(self.board.getPosition(cell))
+
+	def pop(self):
+		cell = self.queue.popleft()
+		if self.searchTrace is not None:
+			self.searchTrace.pop(self.board.getPosition(cell))
+		return (cell, self.depths[cell] if self.depths is not None else 0)
+
+class LifoPolicy(FrontierPolicy):
+	""" Last in first out, for dfs. The neighbours of a node go to the
+	front of the queue in the order they are reached, and any cell not
+	explored yet is taken, so a cell can be queued several times.
+
+	The queue is a stack with its front at the end, so pushing and popping
+	are O(1), and explored cells are marked in a table instead of looked up
+	in a list. Once a cell is explored, the other entries it has in the
+	queue are left where they are and skipped when they come off it, which
+	keeps the search O(V + E) while exploring nodes in the same order as
+	removing them straight away would.
+
+	"""
+	def start(self, board, searchTrace):
+		super(LifoPolicy, self).start(board, searchTrace)
+		self.queue = []
+		# 1 for every cell explored.
+		self.explored = bytearray(board.size)
+
+	def push(self, cells, parent, gVal):
+		explored = self.explored
+		cells = [cell for cell in cells if not explored[cell]]
+		for (index, cell) in enumerate(cells):
+			self.parents[cell] = parent
+			if self.searchTrace is not None:
+				self.searchTrace.push(self.board.getPosition(cell), index)
+		# Put them at the front of the queue, the first one last.
+		self.queue.extend(reversed(cells))
+
+	def pop(self):
+		queue = self.queue
+		explored = self.explored
+		cell = queue.pop()
+		while explored[cell]:
+			# Entry of a cell explored since it was pushed.
+			if len(queue) == 0:
+				return None
+			cell = queue.pop()
+
+		if self.searchTrace is not None:
+			# Every entry of the cell leaves the queue shown in the trace,
+			# which doesn't hold the skipped entries. Record them back to
+			# front so the indexes of the ones before stay valid. This scans
+			# the queue, so it is only done when recording a SearchTrace.
+			position = self.board.getPosition(cell)
+			indexes = [0]
+			index = 1
+			for other in reversed(queue):
+				if other == cell:
+					indexes.append(index)
+				if not explored[other]:
+					index += 1
+			for index in reversed(indexes):
+				self.searchTrace.pop(position, index)
+		explored[cell] = 1
+		return (cell, 0)
+
+class BoundedDfsPolicy(FrontierPolicy):
+	""" Last in first out cut off at a bound on the f value, for IDA*.
+
+	Unlike the other policies one BoundedDfsPolicy runs every iteration of
+	a search, the bound being raised in between, so its tables are only
+	made once. The main one is a transposition table of the lowest g value
+	every cell was reached with so far, in any iteration: a cell is taken
+	when it is reached in fewer moves than that, or in as many moves if it
+	wasn't taken yet in this iteration. A node reached in more moves can't
+	lead anywhere in fewer moves than the one it loses to, so it is pruned,
+	while a cell reached in fewer moves is expanded again. Every iteration
+	thus explores each cell within the bound at its lowest g value, and the
+	path found is a shortest one. The table has an entry per cell, which
+	bounds it by the size of the board.
+
+	The queue is a stack with its front at the end. A cell pushed again with
+	a lower g value leaves its old entry behind, which is skipped when it
+	comes off the stack.
+
+	"""
+	def __init__(self, diamondCell, bound, heuristic=None):
+		""" Initialize the policy.
+
+		:param diamondCell: The cell of the diamond the heuristic value is
+			measured to.
+		:param bound: The threshold on f value for the first iteration.
+			Nodes having f value greater than this aren't taken.
+		:param heuristic: A function returning the heuristic value of a cell,
+			called like getHeuristicValue, which it is if None.
+
+		"""
+		super(BoundedDfsPolicy, self).__init__()
+		self.diamondCell = diamondCell
+		self.heuristic = heuristic if heuristic is not None \
+			else getHeuristicValue
+		self.bound = bound
+		# The lowest f value of the nodes left out for being over the bound,
+		# to start the next iteration with, or -1 if none were.
+		self.nextBound = -1
+		# Number of iterations run, of nodes expanded in all of them and of
+		# those which had been expanded before, in the same iteration with a
+		# higher g value or in an earlier one.
+		self.iterations = 0
+		self.expansions = 0
+		self.reExpansions = 0
+		self.board = None
+
+	def start(self, board, searchTrace):
+		if self.board is not board:
+			super(BoundedDfsPolicy, self).start(board, searchTrace)
+			# No path has as many moves as the board has cells.
+			self.gValues = board.newTable(board.size)
+			# The iteration every cell was last taken in, 0 for none.
+			self.takenIn = board.newTable(0)
+			# 1 for every cell expanded in any iteration.
+			self.expanded = bytearray(board.size)
+		self.searchTrace = searchTrace
+		self.iterations += 1
+		self.nextBound = -1
+		self.queue = []
+
+	def push(self, cells, parent, gVal):
+		board = self.board
+		parents = self.parents
+		gValues = self.gValues
+		takenIn = self.takenIn
+		iteration = self.iterations
+		taken = []
+		for cell in cells:
+			if gVal > gValues[cell] or (gVal == gValues[cell] and
+										takenIn[cell] == iteration):
+				# Already reached in as few moves.
+				continue
+			fVal = gVal + self.heuristic(board, cell, self.diamondCell)
+			if fVal > self.bound:
+				# Don't explore it in this iteration, but start the next one
+				# with the lowest such f value if the goal isn't found.
+				if self.nextBound == -1 or fVal < self.nextBound:
+					self.nextBound = fVal
+				continue
+			parents[cell] = parent
+			gValues[cell] = gVal
+			takenIn[cell] = iteration
+			taken.append((cell, gVal))
+
+		# Put them at the front of the queue, the first one last.
+		self.queue.extend(reversed(taken))
+		if self.searchTrace is not None:
+			for index in range(len(taken)):
+				self.searchTrace.push(board.getPosition(taken[index][0]), index)
+
+	def pop(self):
+		node = self.queue.pop()
+		cell = node[0]
+		if self.searchTrace is not None:
+			self.searchTrace.pop(self.board.getPosition(cell))
+		if node[1] > self.gValues[cell]:
+			# Stale entry, the cell was pushed again with a lower g value.
+			return None
+		self.expansions += 1
+		if self.expanded[cell]:
+			self.reExpansions += 1
+		else:
+			self.expanded[cell] = 1
+		return node
+
+class FringePolicy(FrontierPolicy):
+	""" Fringe search, an IDA* which keeps its frontier between thresholds.
+
+	The frontier is split in two: now, the nodes still to visit under the
+	current threshold on f, and later, the ones found over it. Now is a
+	stack with its front at the end, the children of a node going to its
+	front, so every threshold is searched depth first like an iteration of
+	IDA*. A node popped over the threshold moves to the back of later, and
+	when now runs out later becomes now under the lowest f value it holds.
+	A new threshold thus goes on from the fringe of the last one rather
+	than starting over from the musketeers.
+
+	Like BoundedDfsPolicy a cell is only taken again when reached in fewer
+	moves than before, and the entry it leaves behind is skipped when it
+	comes off the queue. The queue recorded in the trace is now, front
+	first, followed by later. Every cell has at most one live entry, so
+	once the entries are twice as many as the cells of the board the stale
+	ones are dropped, which keeps the memory linear in the board size.
+
+	"""
+	def __init__(self, diamondCell, bound, upperBound=None, heuristic=None):
+		""" Initialize the policy.
+
+		:param diamondCell: The cell of the diamond the heuristic value is
+			measured to.
+		:param bound: The first threshold on f value, nodes having f value
+			greater than this are left for later.
+		:param upperBound: Only look for paths of fewer moves than this, or
+			for any path if None. Nodes whose f value reaches it are pruned.
+		:param heuristic: A function returning the heuristic value of a cell,
+			called like getHeuristicValue, which it is if None.
+
+		"""
+		super(FringePolicy, self).__init__()
+		self.diamondCell = diamondCell
+		self.heuristic = heuristic if heuristic is not None \
+			else getHeuristicValue
+		self.bound = bound
+		self.upperBound = upperBound
+		# Number of thresholds searched, of nodes expanded under all of them
+		# and of those which had been expanded before with a higher g value.
+		self.iterations = 0
+		self.expansions = 0
+		self.reExpansions = 0
+
+	def start(self, board, searchTrace):
+		super(FringePolicy, self).start(board, searchTrace)
+		self.queue = []
+		self.later = []
+		# No path has as many moves as the board has cells.
+		self.gValues = board.newTable(board.size)
+		# 1 for every cell expanded.
+		self.expanded = bytearray(board.size)
+		self.iterations = 1
+
+	def push(self, cells, parent, gVal):
+		board = self.board
+		parents = self.parents
+		gValues = self.gValues
+		taken = []
+		for cell in cells:
+			if gVal >= gValues[cell]:
+				# Already reached in as few moves.
+				continue
+			if self.upperBound is not None and gVal + self.heuristic(
+					board, cell, self.diamondCell) >= self.upperBound:
+				continue
+			parents[cell] = parent
+			gValues[cell] = gVal
+			taken.append((cell, gVal))
+
+		# Put them at the front of now, the first one last.
+		self.queue.extend(reversed(taken))
+		if self.searchTrace is not None:
+			for index in range(len(taken)):
+				self.searchTrace.push(board.getPosition(taken[index][0]), index)
+		if len(self.queue) + len(self.later) > 2 * board.size:
+			self.dropStaleEntries()
+		self.nextThreshold()
+
+	def pop(self):
+		node = self.queue.pop()
+		cell = node[0]
+		if self.searchTrace is not None:
+			self.searchTrace.pop(self.board.getPosition(cell))
+		if node[1] != self.gValues[cell]:
+			# Stale entry, the cell was pushed again with a lower g value.
+			self.nextThreshold()
+			return None
+
+		fVal = node[1] + self.heuristic(self.board, cell, self.diamondCell)
+		if fVal > self.bound:
+			# Leave it for the next threshold.
+			self.later.append(node)
+			if self.searchTrace is not None:
+				self.searchTrace.push(self.board.getPosition(cell))
+			self.nextThreshold()
+			return None
+
+		self.expansions += 1
+		if self.expanded[cell]:
+			self.reExpansions += 1
+		else:
+			self.expanded[cell] = 1
+		return node
+
+	def nextThreshold(self):
+		""" Make later the new now, if now is empty and later isn't, under
+		the lowest f value of its nodes.
+
+		Later is kept in the order its nodes were left out, which is the
+		order the trace shows it in and the order they are visited in under
+		the next threshold.
+
+		"""
+		if len(self.queue) != 0 or len(self.later) == 0:
+			return
+		board = self.board
+		gValues = self.gValues
+		fValues = [
+			gVal + self.heuristic(board, cell, self.diamondCell)
+			for (cell, gVal) in self.later if gVal == gValues[cell]
+		]
+		if len(fValues) != 0:
+			# Else later only holds stale entries, which just get skipped.
+			self.bound = min(fValues)
+		self.iterations += 1
+		self.later.reverse()
+		(self.queue, self.later) = (self.later, [])
+
+	def dropStaleEntries(self):
+		""" Remove the entries of cells pushed again since from now and later.
+		"""
+		gValues = self.gValues
+		if self.searchTrace is not None:
+			# Record the removals back to front so the indexes of the
+			# entries before stay valid.
+			entries = self.later[::-1] + self.queue
+			size = len(entries)
+			for (offset, (cell, gVal)) in enumerate(entries):
+				if gVal != gValues[cell]:
+					self.searchTrace.pop(self.board.getPosition(cell),
+										 size - 1 - offset)
+		self.queue = [node for node in self.queue if node[1] == gValues[node[0]]]
+		self.later = [node for node in self.later if node[1] == gValues[node[0]]]
+
+class HeuristicPolicy(FrontierPolicy):
+	""" Ordered on the heuristic value, for best first search. Every cell is
+	taken the first time it is reached.
+	"""
+	def __init__(self, diamondCell, frontier=ORDERED_FRONTIER, upperBound=None):
+		""" Initialize the policy.
+
+		:param diamondCell: The cell of the diamond the heuristic value is
+			measured to.
+		:param frontier: The kind of priority queue to order the search on,
+			one of the *_FRONTIER kinds of engine.frontier.
+		:param upperBound: Only look for paths of fewer moves than this, or
+			for any path if None. Nodes whose f value reaches it aren't
+			taken.
+
+		"""
+		super(HeuristicPolicy, self).__init__()
+		self.diamondCell = diamondCell
+		self.frontier = frontier
+		self.upperBound = upperBound
+
+	def start(self, board, searchTrace):
+		super(HeuristicPolicy, self).start(board, searchTrace)
+		# Nodes ordered on their heuristic value, ties last in first out
+		# with the bucket frontier.
+		self.queue = getFrontier(self.frontier, indexed=searchTrace is not None)
+
+	def push(self, cells, parent, gVal):
+		board = self.board
+		parents = self.parents
+		for cell in cells:
+			if parents[cell] != UNVISITED:
+				continue
+			heuristicVal = getHeuristicValue(board, cell, self.diamondCell)
+			if self.upperBound is not None \
+			and heuristicVal + gVal >= self.upperBound:
+				# No path through here can be shorter than the bound.
+				continue
+			index = self.queue.push((cell, gVal), heuristicVal)
+			if self.searchTrace is not None:
+				self.searchTrace.push(board.getPosition(cell), index)
+			parents[cell] = parent
+
+	def pop(self):
+		node = self.queue.pop()
+		if self.searchTrace is not None:
+			self.searchTrace.pop(self.board.getPosition(node[0]))
+		return node
+
+class FValuePolicy(FrontierPolicy):
+	""" Ordered on the f value, ties on the heuristic value, for A*. A cell
+	is taken again whenever it is reached in fewer moves than before, and
+	the entries it leaves behind are dropped when popped.
+	"""
+	def __init__(self, diamondCell, frontier=ORDERED_FRONTIER, upperBound=None,
+				 heuristic=None):
+		""" Initialize the policy.
+
+		:param diamondCell: The cell of the diamond the heuristic value is
+			measured to, or None for a heuristic value of 0, which makes it
+			Dijkstra's algorithm.
+		:param frontier: The kind of priority queue to order the search on,
+			one of the *_FRONTIER kinds of engine.frontier.
+		:param upperBound: Only look for paths of fewer moves than this, or
+			for any path if None. Nodes whose f value reaches it aren't
+			taken.
+		:param heuristic: A function returning the heuristic value of a cell,
+			called like getHeuristicValue, which it is if None.
+
+		"""
+		super(FValuePolicy, self).__init__()
+		self.diamondCell = diamondCell
+		self.heuristic = heuristic if heuristic is not None \
+			else getHeuristicValue
+		self.frontier = frontier
+		self.upperBound = upperBound
+
+	def start(self, board, searchTrace):
+		super(FValuePolicy, self).start(board, searchTrace)
+		self.queue = getFrontier(self.frontier, indexed=searchTrace is not None)
+		# Cheapest g value found so far for each cell.
+		self.gValues = board.newTable()
+
+	def push(self, cells, parent, gVal):
+		board = self.board
+		gValues = self.gValues
+		for cell in cells:
+			if gValues[cell] != UNVISITED and gValues[cell] <= gVal:
+				continue
+			heuristicVal = 0
+			if self.diamondCell is not None:
+				heuristicVal = self.heuristic(board, cell, self.diamondCell)
+			if self.upperBound is not None \
+			and heuristicVal + gVal >= self.upperBound:
+				# No path through here can be shorter than the bound.
+				continue
+			index = self.queue.push((cell, gVal), heuristicVal + gVal,
+									heuristicVal)
+			if self.searchTrace is not None:
+				self.searchTrace.push(board.getPosition(cell), index)
+			self.parents[cell] = parent
+			gValues[cell] = gVal
+
+	def pop(self):
+		node = self.queue.pop()
+		if self.searchTrace is not None:
+			self.searchTrace.pop(self.board.getPosition(node[0]))
+		if node[1] > self.gValues[node[0]]:
+			# Stale entry, the cell was pushed again with a lower g value.
+			return None
+		return node
+
+class WrappedPolicy(FrontierPolicy):
+	""" A policy which leaves its frontier to another one.
+
+	Subclasses change what a node leads to, by overriding expand and
+	getPath, while the other policy, a FValuePolicy for A* or a
+	HeuristicPolicy for best first search, keeps and orders the frontier
+	and records it on the trace as usual.
+
+	"""
+	def __init__(self, policy):
+		""" Initialize the policy.
+
+		:param policy: A fresh FrontierPolicy to keep the frontier.
+
+		"""
+		super(WrappedPolicy, self).__init__()
+		self.policy = policy
+
+	def start(self, board, searchTrace):
+		self.policy.start(board, searchTrace)
+		self.board = board
+		self.searchTrace = searchTrace
+		self.parents = self.policy.parents
+		self.queue = self.policy.queue
+
+	def push(self, cells, parent, gVal):
+		self.policy.push(cells, parent, gVal)
+
+	def pop(self):
+		return self.policy.pop()
+
+def getHeuristicValue(board, cell, diamondCell):
+	""" Return the heuristic value of a cell.
+
+	:param board: The game board as a Board.
+	:param cell: The cell whose heuristic value is to be calculated.
+	:param diamondCell: The cell of the diamond on the board.
+	:return: The heuristic value of the cell.
+
+	"""
+	return board.getDistance(cell, diamondCell)
+
+def getMusketeerPositions(board):
+	""" Return the [row, col] of every musketeer on a Board.
+	"""
+	return [board.getPosition(cell) for cell in board.findCells(MUSKETEER)]
+
+def getMusketeerAndDiamondPositions(board):
+	""" Return the position of musketeers and diamond on the game board.
+
+	:param board: The game board as a Board.
+	:return: A tuple containing a list of muskeeter positions and [row, col]
+		for the diamond position, the last diamond if there are several.
+
+	"""
+	diamondCells = board.findCells(DIAMOND)
+	diamondPosition = []
+	if len(diamondCells) != 0:
+		diamondPosition = board.getPosition(diamondCells[-1])
+	return (getMusketeerPositions(board), diamondPosition)
+
+def orderMusketeers(board, musketeerPositions, diamondCells):
+	""" Sort the musketeers closest to a diamond first, those as close in
+	the order of their cells on the board.
+
+	The musketeer closest to the diamond is the likeliest to find the
+	shortest path, so the searches after it can prune every node which
+	can't lead to a shorter one.
+
+	:param board: The game board as a Board.
+	:param musketeerPositions: The [row, col] of every musketeer, sorted in
+		place.
+	:param diamondCells: The cells of the diamonds.
+	:returns: For every musketeer in the new order, the manhattan distance
+		to the closest diamond, 0 if there is none, which is a lower bound
+		on the moves of any path from it.
+
+	"""
+	getLowerBound = lambda position: min([
+		getHeuristicValue(board, board.getCell(position), diamondCell)
+		for diamondCell in diamondCells
+	] or [0])
+	musketeerPositions.sort(
+		key=lambda position: (getLowerBound(position), board.getCell(position))
+	)
+	return [getLowerBound(position) for position in musketeerPositions]
+
+def searchEachMusketeer(search, board, musketeerPositions, args=(),
+						bounded=True):
+	""" Search from every musketeer in turn and keep the shortest path.
+
+	:param search: A function searching from a single musketeer, called as
+		search(board, musketeerPosition, *args, upperBound=upperBound) if
+		bounded, else as search(board, musketeerPosition, *args), and
+		returning what getSearchResult does.
+	:param board: The game board as a Board.
+	:param musketeerPositions: The [row, col] of every musketeer.
+	:param args: The arguments to search after the musketeer's position.
+	:param bounded: If True, every search only looks for paths shorter than
+		the shortest one found so far.
+	:returns: The result of the search of the musketeer with the shortest
+		path, the first one of them in order, or of the last musketeer if
+		none of them has a path. If bounded, that is the result of its
+		bounded search, whose trace leaves out the nodes pruned on the
+		bound of the musketeers searched before it.
+
+	"""
+	result = None
+	shortestPath = []
+	for musketeerPosition in musketeerPositions:
+		if bounded:
+			upperBound = len(shortestPath) - 1 if len(shortestPath) != 0 else None
+			newResult = search(board, musketeerPosition, *args,
+							   upperBound=upperBound)
+		else:
+			newResult = search(board, musketeerPosition, *args)
+		newShortestPath = getResultPath(newResult)
+
+		if  shortestPath == [] \
+		or  (
+				len(newShortestPath) < len(shortestPath) \
+				and len(newShortestPath) > 0
+			):
+			(result, shortestPath) = (newResult, newShortestPath)
+
+	return result
+
+def bidirectionalBfsSearch(board, musketeerPositions, trace=TRACE_FULL):
+	""" Perform a bfs search on the game board from the given musketeers
+	and from the diamond at once until the two searches meet.
+
+	Each step expands a whole level of whichever search has the smaller
+	one, so on an open board both searches only cover about half the
+	distance to the diamond, together exploring around half as many
+	nodes as a single bfs. Backwards from the diamond, the positions a
+	musketeer could have come from are the soldiers next to it. The
+	first time a position next to one search is reached by the other the
+	path through them is a shortest one, and both halves of it are
+	backtraced from the one parent table the searches share.
+
+	:param board: The game board, a Board or a 2d list of integers.
+	:param musketeerPositions: A list of [row, col] of musketeers on the board.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels or a bool.
+	:returns: A tuple containing exploredNodes, searchQueue, shortestPath.
+		searchQueue is a SearchTrace of the queues of both searches in
+		every iteration, the one from the musketeers first. With
+		TRACE_NONE only shortestPath and its length are returned.
+
+	"""
+	trace = getTraceLevel(trace)
+	traceExplored = trace >= TRACE_EXPLORED
+	traceQueue = trace == TRACE_FULL
+	board = getBoard(board)
+	cells = board.cells
+	shortestPath = []
+	exploredNodes = [] if traceExplored else None
+	# Pushes and pops done on both queues in each iteration.
+	iterativeSearchQueue = SearchTrace() if traceQueue else None
+	# Table of the cell every cell was visited from, towards the musketeer
+	# for cells reached by the forward search and towards the diamond for
+	# the ones reached by the backward search.
+	parents = board.newTable()
+	# FORWARD or BACKWARD for the cells reached by either search.
+	sides = bytearray(board.size)
+	# Number of cells in the forward queue, whose trace comes first.
+	forwardQueueSize = 0
+	meeting = None
+
+	forwardLevel = []
+	for musketeerPosition in musketeerPositions:
+		cell = board.getCell(musketeerPosition)
+		sides[cell] = FORWARD
+		forwardLevel.append(cell)
+		if traceQueue:
+			iterativeSearchQueue.push(musketeerPosition, forwardQueueSize)
+		forwardQueueSize += 1
+	backwardLevel = board.findCells(DIAMOND)
+	for cell in backwardLevel:
+		sides[cell] = BACKWARD
+		if traceQueue:
+			iterativeSearchQueue.push(board.getPosition(cell))
+
+	while meeting is None and len(forwardLevel) != 0 \
+	and len(backwardLevel) != 0:
+		forward = len(forwardLevel) <= len(backwardLevel)
+		level = forwardLevel if forward else backwardLevel
+		nextLevel = []
+		for cell in level:
+			if traceExplored:
+				exploredNodes.append(board.getPosition(cell))
+			if forward:
+				forwardQueueSize -= 1
+				if traceQueue:
+					iterativeSearchQueue.pop(board.getPosition(cell))
+				# Forwards a musketeer can move into soldiers and the
+				# diamond only, backwards anything the forward search
+				# reached could have moved into this cell.
+				neighbours = board.getNeighbours(cell)
+			else:
+				if traceQueue:
+					iterativeSearchQueue.pop(board.getPosition(cell),
+											 forwardQueueSize)
+				neighbours = board.getAdjacent(cell)
+
+			for neighbour in neighbours:
+				if sides[neighbour] == 0:
+					if not forward and cells[neighbour] < SOLDIER:
+						continue
+					sides[neighbour] = FORWARD if forward else BACKWARD
+					parents[neighbour] = cell
+					nextLevel.append(neighbour)
+					if traceQueue and forward:
+						iterativeSearchQueue.push(board.getPosition(neighbour),
+												  forwardQueueSize)
+					elif traceQueue:
+						iterativeSearchQueue.push(board.getPosition(neighbour))
+					if forward:
+						forwardQueueSize += 1
+				elif sides[neighbour] != sides[cell]:
+					# The searches met.
+					meeting = (cell, neighbour) if forward \
+						else (neighbour, cell)
+					break
+
+			if traceQueue:
+				iterativeSearchQueue.endIteration()
+			if meeting is not None:
+				break
+
+		if forward:
+			forwardLevel = nextLevel
+		else:
+			backwardLevel = nextLevel
+
+	if meeting is not None:
+		(forwardCell, backwardCell) = meeting
+		shortestPath = board.getPath(parents, forwardCell) \
+			+ board.getPath(parents, backwardCell)[::-1]
+
+	return getSearchResult(trace, exploredNodes, iterativeSearchQueue,
+						   shortestPath)
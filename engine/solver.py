@@ -0,0 +1,163 @@
+""" Running the searches without the visualization.
+
+Nothing here imports the view or pygame, only the controller of the
+algorithm asked for. Search a board from Python with
+
+	from engine.solver import solve
+	(shortestPath, moves) = solve('input.txt', algorithm='bfs')
+
+or from the top folder with
+
+	python -m engine.solver --algorithm bfs BFS/input.txt
+
+"""
+import argparse
+import collections
+import imp
+import os
+import sys
+
+from engine.board import DIAMOND, MUSKETEER, getBoard, loadBoard
+from engine.landmark import getLandmarkTable
+from engine.region import pruneBoard
+from engine.search import getMusketeerPositions
+from engine.trace import TRACE_NONE, getResultPath
+
+# Folder of the controller of every algorithm, keyed on its name.
+ALGORITHMS = collections.OrderedDict([
+	('bfs', 'BFS'),
+	('dfs', 'DFS'),
+	('best-first', 'BestFirstSearch'),
+	('astar', 'Astar'),
+	('idastar', 'IDAstar'),
+])
+
+# The folder holding the algorithm folders.
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+# Controller modules loaded so far keyed on the name of their algorithm.
+controllers = {}
+
+def getController(algorithm):
+	""" Return the controller module of an algorithm.
+
+	Every algorithm folder has its own controller1.py, so they are loaded
+	under a name of their own, once, rather than imported.
+
+	:param algorithm: One of the names in ALGORITHMS.
+	:returns: The controller1 module of the algorithm.
+	:raises ValueError: If algorithm isn't one of ALGORITHMS.
+
+	"""
+	if algorithm not in ALGORITHMS:
+		raise ValueError('unknown algorithm %r, expected one of %s' % (
+			algorithm, ', '.join(ALGORITHMS)
+		))
+	controller = controllers.get(algorithm)
+	if controller is None:
+		folder = ALGORITHMS[algorithm]
+		controller = imp.load_source(
+			'controller1' + folder,
+			os.path.join(ROOT, folder, 'controller1.py')
+		)
+		controllers[algorithm] = controller
+	return controller
+
+def solve(board, algorithm='astar', trace=TRACE_NONE, **options):
+	""" Search a board with one of the algorithms.
+
+	:param board: The game board, a Board, a 2d list of integers or the
+		path of a board file for engine.board.loadBoard.
+	:param algorithm: One of the names in ALGORITHMS.
+	:param trace: How much of the search to record, one of the TRACE_*
+		levels of engine.trace.
+	:param options: Other keyword arguments to the singleAgentSearch of the
+		algorithm, like multiSource.
+	:returns: What singleAgentSearch returns, by default the shortest path
+		found and its length in moves.
+	:raises ValueError: If algorithm isn't one of ALGORITHMS.
+
+	"""
+	controller = getController(algorithm)
+	if isinstance(board, basestring):
+		board = loadBoard(board)
+	else:
+		board = getBoard(board)
+	return controller.singleAgentSearch(board, trace=trace, **options)
+
+def formatPath(path):
+	""" Return a path as text, the row,col of every position on it
+	separated by spaces, or - for no path.
+	"""
+	if len(path) == 0:
+		return '-'
+	return ' '.join('%d,%d' % tuple(position) for position in path)
+
+def main(arguments=None):
+	""" Solve a board from the command line and print the number of moves
+	and the path, -1 and - if there is none, then with --statistics the
+	counts of the search, one name and count per line. Exits with a
+	message instead if the board has no musketeer or no diamond.
+	"""
+	parser = argparse.ArgumentParser(
+		prog='python -m engine.solver',
+		description='Solve a board without the visualization.'
+	)
+	parser.add_argument('path', help='board file, text or binary')
+	parser.add_argument('-a', '--algorithm', choices=list(ALGORITHMS),
+						default='astar')
+	parser.add_argument('-m', '--multi-source', action='store_true',
+						help='search from all the musketeers at once')
+	parser.add_argument('-p', '--prune', action='store_true',
+						help='skip the musketeers which can\'t reach a diamond '
+						'and the dead ends')
+	parser.add_argument('-d', '--distance-field', action='store_true',
+						help='walk down the cached distance field of the board '
+						'instead of searching, bfs only')
+	parser.add_argument('-l', '--landmarks', action='store_true',
+						help='use the landmark heuristic, kept in a file next '
+						'to the board, astar and idastar only')
+	parser.add_argument('-s', '--statistics', action='store_true',
+						help='print the iterations and expansions, idastar only')
+	arguments = parser.parse_args(arguments)
+	if arguments.statistics and arguments.algorithm != 'idastar':
+		parser.error('--statistics is only supported by idastar')
+	if arguments.distance_field and arguments.algorithm != 'bfs':
+		parser.error('--distance-field is only supported by bfs')
+	if arguments.landmarks and arguments.algorithm not in ('astar', 'idastar'):
+		parser.error('--landmarks is only supported by astar and idastar')
+
+	options = {
+		'multiSource': arguments.multi_source, 'prune': arguments.prune
+	}
+	statistics = {}
+	if arguments.statistics:
+		options['statistics'] = statistics
+	if arguments.distance_field:
+		options['distanceField'] = True
+	board = loadBoard(arguments.path)
+	# The controllers tell boards without a musketeer or a diamond apart in
+	# ways of their own, printing, raising or searching anyway, so they are
+	# caught here to exit the same way for every algorithm.
+	if len(board.findCells(MUSKETEER)) == 0:
+		sys.exit('no musketeer on the board')
+	if len(board.findCells(DIAMOND)) == 0:
+		sys.exit('no diamond on the board')
+	if arguments.landmarks:
+		# Read the table from next to the board file, or build it and write
+		# it there, so that the search only finds it in the cache. With
+		# --prune the search runs on the pruned board, so the table kept is
+		# the one of the pruned board.
+		searchedBoard = board
+		if arguments.prune:
+			(searchedBoard, _) = pruneBoard(board, getMusketeerPositions(board))
+		getLandmarkTable(searchedBoard, arguments.path)
+		options['landmarks'] = True
+	result = solve(board, arguments.algorithm, **options)
+	shortestPath = getResultPath(result)
+	print '%d\t%s' % (len(shortestPath) - 1, formatPath(shortestPath))
+	for name in sorted(statistics):
+		print '%s\t%d' % (name, statistics[name])
+
+if __name__ == '__main__':
+	main()
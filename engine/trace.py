@@ -0,0 +1,188 @@
+from array import array
+
+# Kinds of events recorded in a SearchTrace.
+PUSH = 0
+POP = 1
+
+# Number of integers stored per event: kind, index, row and col.
+EVENT_SIZE = 4
+
+# How much of a search is recorded. With TRACE_NONE a search only returns
+# the path it found and its length, TRACE_EXPLORED also keeps the explored
+# nodes and TRACE_FULL the queue in every iteration as well.
+TRACE_NONE = 0
+TRACE_EXPLORED = 1
+TRACE_FULL = 2
+
+def getTraceLevel(trace):
+	""" Return the trace level for a trace argument.
+
+	:param trace: One of the TRACE_* levels, or True for TRACE_FULL and
+		False for TRACE_NONE.
+	:returns: One of the TRACE_* levels.
+
+	"""
+	if trace is True:
+		return TRACE_FULL
+	if trace is False:
+		return TRACE_NONE
+	if trace not in (TRACE_NONE, TRACE_EXPLORED, TRACE_FULL):
+		raise ValueError('unknown trace level %r' % (trace,))
+	return trace
+
+def getSearchResult(trace, exploredNodes, searchQueue, shortestPath):
+	""" Return what a search returns for the given trace level.
+
+	:param trace: The TRACE_* level the search ran with.
+	:param exploredNodes: The explored nodes, or None if not recorded.
+	:param searchQueue: The SearchTrace of the queue, or None if not recorded.
+	:param shortestPath: The path found, or an empty list.
+	:returns: A tuple containing shortestPath and its length in moves (-1
+		if no path was found) for TRACE_NONE, else a tuple containing
+		exploredNodes, searchQueue, shortestPath.
+
+	"""
+	if trace == TRACE_NONE:
+		return (shortestPath, len(shortestPath) - 1)
+	return (exploredNodes, searchQueue, shortestPath)
+
+def getNoPathResult(trace):
+	""" Return what a search which found no path without exploring any
+	node returns for the given trace level.
+	"""
+	return getSearchResult(
+		trace, [] if trace >= TRACE_EXPLORED else None,
+		SearchTrace() if trace == TRACE_FULL else None, []
+	)
+
+def getResultPath(result):
+	""" Return the path out of what getSearchResult returned.
+	"""
+	if len(result) == 2:
+		return result[0]
+	return result[2]
+
+class SearchTrace(object):
+	""" Delta encoded record of the search queue over the iterations
+	of a search.
+
+	Rather than keeping a full copy of the search queue for every
+	iteration, only the pushes and pops done in each iteration are
+	recorded. The trace can still be used like the list of queue snapshots
+	it replaces: len(trace) is the number of iterations and trace[i]
+	rebuilds the queue as it was at the end of iteration i by replaying
+	the events from the queue it rebuilt last, so stepping to the next or
+	previous iteration only costs the size of the change.
+
+	"""
+	def __init__(self):
+		""" Initialize an empty trace.
+		"""
+		super(SearchTrace, self).__init__()
+		# Flat list of events, EVENT_SIZE integers each.
+		self.events = array('i')
+		# Number of events recorded by the end of each iteration.
+		self.iterationEnds = array('l')
+		# Size of the queue being recorded.
+		self.size = 0
+
+		# The queue as rebuilt for the last iteration read and the number
+		# of events applied to get it.
+		self.queue = []
+		self.applied = 0
+
+	def push(self, position, index=None):
+		""" Record a push onto the queue.
+
+		:param position: The [row, col] pushed.
+		:param index: The index at which position was inserted. Defaults to
+			the end of the queue.
+
+		"""
+		if index is None:
+			index = self.size
+		self.events.extend((PUSH, index, position[0], position[1]))
+		self.size += 1
+
+	def pop(self, position, index=0):
+		""" Record a pop from the queue.
+
+		:param position: The [row, col] popped.
+		:param index: The index position was removed from. Defaults to
+			the front of the queue.
+
+		"""
+		self.events.extend((POP, index, position[0], position[1]))
+		self.size -= 1
+
+	def endIteration(self):
+		""" Mark the end of an iteration of the search.
+
+		Everything recorded since the previous call makes up the change to
+		the queue in this iteration.
+
+		"""
+		self.iterationEnds.append(len(self.events) // EVENT_SIZE)
+
+	def extend(self, other):
+		""" Append the iterations recorded in another trace.
+
+		:param other: The SearchTrace of a search which started with an
+			empty queue, like the next iteration of an iterative deepening
+			search.
+		:raises ValueError: If the queue recorded so far isn't empty, as the
+			other trace wouldn't continue from it.
+
+		"""
+		if self.size != 0:
+			raise ValueError('can only extend a trace which ends empty')
+		offset = len(self.events) // EVENT_SIZE
+		self.events.extend(other.events)
+		self.iterationEnds.extend(end + offset for end in other.iterationEnds)
+		self.size = other.size
+
+	def __len__(self):
+		return len(self.iterationEnds)
+
+	def __getitem__(self, iteration):
+		""" Return the queue at the end of the given iteration.
+
+		:param iteration: Index of the iteration, or a slice of them.
+		:returns: A list of the [row, col] in the queue, front first.
+
+		"""
+		if isinstance(iteration, slice):
+			return [self[i] for i in range(*iteration.indices(len(self)))]
+		if iteration < 0:
+			iteration += len(self)
+		if not 0 <= iteration < len(self):
+			raise IndexError('search trace index out of range')
+
+		target = self.iterationEnds[iteration]
+		while self.applied < target:
+			self.applyEvent(self.applied)
+			self.applied += 1
+		while self.applied > target:
+			self.applied -= 1
+			self.undoEvent(self.applied)
+		return list(self.queue)
+
+	def applyEvent(self, n):
+		""" Replay the nth event on the rebuilt queue.
+		"""
+		offset = n * EVENT_SIZE
+		(kind, index, row, col) = self.events[offset:offset + EVENT_SIZE]
+		if kind == PUSH:
+			self.queue.insert(index, [row, col])
+		else:
+			del self.queue[index]
+
+	def undoEvent(self, n):
+		""" Revert the nth event on the rebuilt queue.
+		"""
+		offset = n * EVENT_SIZE
+		(kind, index, row, col) = self.events[offset:offset + EVENT_SIZE]
+		if kind == PUSH:
+			del self.queue[index]
+		else:
+			self.queue.insert(index, [row, col])
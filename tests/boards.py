@@ -0,0 +1,108 @@
+""" Boards shared by the tests, and what plain bfs finds on them.
+"""
+import random
+
+from engine.solver import solve
+
+# Small boards of corridors, dead ends, several musketeers and diamonds,
+# and boards without any path.
+FIXED_BOARDS = [
+	[
+		[0, 2, 2, 2, 1],
+		[2, 2, 2, 0, 2],
+		[2, 1, 0, 3, 2],
+		[2, 2, 0, 2, 2],
+		[1, 2, 2, 2, 0],
+	],
+	[
+		[1, 2, 2, 2, 2, 2, 2],
+		[0, 0, 0, 0, 0, 0, 2],
+		[2, 2, 2, 2, 2, 0, 2],
+		[2, 0, 0, 0, 2, 0, 2],
+		[2, 2, 3, 0, 2, 2, 2],
+	],
+	[
+		[1, 2, 0, 2, 2, 2],
+		[0, 2, 2, 2, 0, 2],
+		[0, 2, 0, 0, 0, 2],
+		[0, 2, 2, 2, 2, 3],
+		[1, 2, 0, 0, 0, 2],
+	],
+	[[1, 2, 2, 3, 2, 2, 1]],
+	[[2], [1], [2], [2], [3], [2], [0], [1]],
+	[
+		[1, 0, 2],
+		[0, 2, 2],
+		[2, 2, 3],
+	],
+	[
+		[3, 2, 0, 0],
+		[2, 0, 2, 1],
+		[0, 2, 2, 2],
+		[1, 2, 0, 3],
+	],
+]
+
+def getRandomBoard(rows, columns, soldiers, musketeers, seed):
+	""" Return a board of soldiers and empty cells with a diamond and some
+	musketeers dropped on it at random.
+
+	:param rows: Number of rows of the board.
+	:param columns: Number of columns of the board.
+	:param soldiers: Chance of every other cell to be a soldier.
+	:param musketeers: Number of musketeers on the board.
+	:param seed: Seed of the random numbers, so the board is always the
+		same.
+	:returns: The board as a 2d list of integers.
+
+	"""
+	generator = random.Random(seed)
+	board = [[2 if generator.random() < soldiers else 0
+			  for _ in xrange(columns)] for _ in xrange(rows)]
+	positions = [(row, col) for row in xrange(rows) for col in xrange(columns)]
+	generator.shuffle(positions)
+	(row, col) = positions[0]
+	board[row][col] = 3
+	for (row, col) in positions[1:1 + musketeers]:
+		board[row][col] = 1
+	return board
+
+def getRandomBoards(count, maxSide=16):
+	""" Return count random boards of up to maxSide cells a side, square
+	and not, more or less open and with one to three musketeers.
+	"""
+	return [
+		getRandomBoard(2 + seed % (maxSide - 1),
+					   2 + seed * 7 % (maxSide - 1),
+					   (0.5, 0.6, 0.7, 0.8, 1.0)[seed % 5], 1 + seed % 3, seed)
+		for seed in xrange(count)
+	]
+
+def getMoves(board, musketeerPosition=None):
+	""" Return the number of moves of the shortest path plain bfs finds on a
+	board, -1 if there is none.
+
+	:param board: The game board as a 2d list of integers.
+	:param musketeerPosition: The [row, col] of the only musketeer to
+		search from, or None for all of them.
+
+	"""
+	if musketeerPosition is not None:
+		board = [
+			[0 if value == 1 and [row, col] != list(musketeerPosition)
+			 else value for (col, value) in enumerate(cells)]
+			for (row, cells) in enumerate(board)
+		]
+	return solve(board, 'bfs')[1]
+
+def isPath(board, path):
+	""" Return whether a path is empty or goes from a musketeer to a diamond
+	one move at a time through soldiers.
+	"""
+	if len(path) == 0:
+		return True
+	values = [board[row][col] for (row, col) in path]
+	steps = zip(path, path[1:])
+	return values[0] == 1 and values[-1] == 3 \
+		and all(value in (2, 3) for value in values[1:]) \
+		and all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for (a, b) in steps)
@@ -0,0 +1,39 @@
+""" Searches over the corridor graph of a board, see engine.corridor.
+
+Run from the top folder with
+
+	python -m unittest discover tests
+
+"""
+import unittest
+
+from boards import FIXED_BOARDS, getMoves, getRandomBoards, isPath
+from engine.corridor import clearCorridorGraphCache
+from engine.solver import solve
+
+class CorridorTest(unittest.TestCase):
+	""" A* and bfs over the corridor graph find paths as short as plain bfs
+	on the grid, and fill the corridors of the path back in.
+	"""
+	boards = FIXED_BOARDS + getRandomBoards(200)
+
+	def tearDown(self):
+		clearCorridorGraphCache()
+
+	def assertShortest(self, algorithm):
+		for board in self.boards:
+			moves = getMoves(board)
+			for multiSource in (False, True):
+				(path, found) = solve(board, algorithm, corridors=True,
+									  multiSource=multiSource)
+				self.assertEqual(found, moves, (board, multiSource))
+				self.assertTrue(isPath(board, path), (board, path))
+
+	def testAStar(self):
+		self.assertShortest('astar')
+
+	def testBfs(self):
+		self.assertShortest('bfs')
+
+if __name__ == '__main__':
+	unittest.main()
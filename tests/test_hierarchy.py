@@ -0,0 +1,104 @@
+""" Hierarchical A* over clusters of the board, see engine.hierarchy.
+
+Run from the top folder with
+
+	python -m unittest discover tests
+
+"""
+import random
+import unittest
+
+from boards import FIXED_BOARDS, getMoves, getRandomBoards, isPath
+from engine.board import DIAMOND, MUSKETEER, getBoard
+from engine.hierarchy import (
+	ClusterGraph, HierarchicalPolicy, clearClusterGraphCache
+)
+from engine.search import FValuePolicy, graphSearch
+from engine.solver import solve
+from engine.trace import TRACE_NONE
+
+# The searches only look for the last diamond of a board, so the boards
+# with several are left out.
+BOARDS = [
+	board for board in FIXED_BOARDS + getRandomBoards(200, maxSide=24)
+	if sum(row.count(3) for row in board) == 1
+]
+
+def getStructure(graph):
+	""" Return the entrances, crossings and paths of a cluster graph in an
+	order of their own, to compare graphs built in different ways.
+	"""
+	return (
+		sorted((key, sorted(pairs))
+			   for (key, pairs) in graph.entrances.items()),
+		sorted((cell, sorted(crossings))
+			   for (cell, crossings) in graph.crossings.items()
+			   if len(crossings) != 0),
+		sorted((cell, sorted(paths.items()))
+			   for (cell, paths) in graph.paths.items()),
+	)
+
+class HierarchicalSearchTest(unittest.TestCase):
+	""" HPA* finds a path whenever plain bfs does, never a shorter one than
+	it, and one a musketeer can walk.
+	"""
+	def tearDown(self):
+		clearClusterGraphCache()
+
+	def assertPath(self, board, path, moves):
+		self.assertTrue(isPath(board, path), (board, path))
+		self.assertEqual(len(path) == 0, moves == -1, (board, path))
+		self.assertTrue(len(path) - 1 >= moves, (board, path))
+
+	def testClusterSizes(self):
+		for board in BOARDS:
+			moves = getMoves(board)
+			compact = getBoard(board)
+			diamondCell = compact.findCells(DIAMOND)[-1]
+			for clusterSize in (2, 3, 4, 8):
+				graph = ClusterGraph(compact, clusterSize)
+				policy = HierarchicalPolicy(FValuePolicy(diamondCell),
+											diamondCell, graph)
+				(_, _, path) = graphSearch(compact,
+										   compact.findCells(MUSKETEER),
+										   policy, TRACE_NONE)
+				self.assertPath(board, path, moves)
+
+	def testAStar(self):
+		for board in BOARDS:
+			moves = getMoves(board)
+			for multiSource in (False, True):
+				(path, _) = solve(board, 'astar', hierarchical=True,
+								  multiSource=multiSource)
+				self.assertPath(board, path, moves)
+
+class UpdateCellsTest(unittest.TestCase):
+	""" A cluster graph updated with ClusterGraph.updateCells is the same as
+	the graph built again from the changed board.
+	"""
+	def tearDown(self):
+		clearClusterGraphCache()
+
+	def testUpdateCells(self):
+		generator = random.Random(0)
+		for (index, board) in enumerate(getRandomBoards(100, maxSide=24)):
+			clusterSize = (2, 3, 4, 5)[index % 4]
+			graph = ClusterGraph(getBoard(board), clusterSize)
+			for _ in xrange(3):
+				# Soldiers captured and soldiers put back.
+				changes = []
+				for _ in xrange(generator.randint(1, 4)):
+					row = generator.randrange(len(board))
+					col = generator.randrange(len(board[0]))
+					if board[row][col] in (0, 2):
+						board[row][col] = 2 - board[row][col]
+						changes.append(([row, col], board[row][col]))
+				graph.updateCells(changes)
+				self.assertEqual(
+					getStructure(graph),
+					getStructure(ClusterGraph(getBoard(board), clusterSize)),
+					(board, clusterSize, changes)
+				)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,68 @@
+""" Incremental replanning with D* Lite, see engine.incremental.
+
+Run from the top folder with
+
+	python -m unittest discover tests
+
+"""
+import random
+import unittest
+
+from boards import FIXED_BOARDS, getMoves, getRandomBoards, isPath
+from engine.incremental import IncrementalPlanner
+
+def getMusketeerPositions(board):
+	""" Return the [row, col] of every musketeer on a 2d list board.
+	"""
+	return [[row, col] for (row, cells) in enumerate(board)
+			for (col, value) in enumerate(cells) if value == 1]
+
+class IncrementalPlannerTest(unittest.TestCase):
+	""" The planner finds paths as short as plain bfs from its musketeer,
+	first and after every change of the board.
+	"""
+	def assertShortest(self, board, path, musketeerPosition):
+		moves = getMoves(board, musketeerPosition)
+		self.assertEqual(len(path) - 1, moves, (board, musketeerPosition))
+		self.assertTrue(isPath(board, path), (board, path))
+		if len(path) != 0:
+			self.assertEqual(path[0], musketeerPosition)
+
+	def testGetShortestPath(self):
+		for board in FIXED_BOARDS + getRandomBoards(200):
+			for position in getMusketeerPositions(board):
+				planner = IncrementalPlanner(board, position)
+				self.assertShortest(board, planner.getShortestPath(), position)
+
+	def testUpdateCells(self):
+		generator = random.Random(0)
+		for board in getRandomBoards(100):
+			position = getMusketeerPositions(board)[0]
+			# The planner copies the board, which is changed along with it.
+			board = [row[:] for row in board]
+			planner = IncrementalPlanner(board, position)
+			path = planner.getShortestPath()
+			for _ in xrange(10):
+				changes = []
+				newPosition = None
+				if len(path) > 2 and generator.random() < 0.3:
+					# The musketeer captures the soldier on its next move.
+					newPosition = list(path[1])
+					changes = [(position, 0), (newPosition, 1)]
+				else:
+					# Soldiers captured or put back, and diamonds moved.
+					for _ in xrange(generator.randint(1, 3)):
+						row = generator.randrange(len(board))
+						col = generator.randrange(len(board[0]))
+						if board[row][col] != 1:
+							value = generator.choice((0, 2, 2, 3))
+							changes.append(([row, col], value))
+				for ((row, col), value) in changes:
+					board[row][col] = value
+				if newPosition is not None:
+					position = newPosition
+				path = planner.updateCells(changes, newPosition)
+				self.assertShortest(board, path, position)
+
+if __name__ == '__main__':
+	unittest.main()
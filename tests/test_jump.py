@@ -0,0 +1,50 @@
+""" Jump point search on boards a single row or column wide, where a step
+of one cell can be vertical.
+
+Run from the top folder with
+
+	python -m unittest discover tests
+
+"""
+import unittest
+
+from engine.solver import solve
+
+class ThinBoardTest(unittest.TestCase):
+	""" Jump point search finds the same path as the plain searches on
+	boards of one column or one row.
+	"""
+	boards = [
+		[[3], [1], [0], [1], [1], [2], [2], [2]],
+		[[2], [2], [1], [2], [3]],
+		[[1], [3]],
+		[[3, 2, 1, 2]],
+		[[1, 2, 2, 0, 2, 3]],
+		[[2, 1, 2, 2, 3, 2]],
+	]
+
+	def assertSamePath(self, algorithm, **options):
+		for board in self.boards:
+			for multiSource in (False, True):
+				expected = solve(board, algorithm, multiSource=multiSource)
+				found = solve(board, algorithm, multiSource=multiSource,
+							  jump=True, **options)
+				self.assertEqual(found, expected, (board, multiSource))
+
+	def testAStar(self):
+		self.assertSamePath('astar')
+
+	def testAStarLandmarks(self):
+		self.assertSamePath('astar', landmarks=True)
+
+	def testBestFirst(self):
+		self.assertSamePath('best-first')
+
+	def testOneColumn(self):
+		self.assertEqual(
+			solve([[3], [1], [0], [1], [1], [2], [2], [2]], 'astar', jump=True),
+			([[1, 0], [0, 0]], 1)
+		)
+
+if __name__ == '__main__':
+	unittest.main()
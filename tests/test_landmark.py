@@ -0,0 +1,149 @@
+""" The landmark heuristic and the landmark tables kept next to the boards.
+
+Run from the top folder with
+
+	python -m unittest discover tests
+
+"""
+import os
+import shutil
+import StringIO
+import sys
+import tempfile
+import unittest
+
+from boards import FIXED_BOARDS, getMoves, getRandomBoards, isPath
+from engine.board import InvalidBoard, getBoard
+from engine.landmark import (
+	LandmarkTable, clearLandmarkTableCache, readLandmarkTable,
+	writeLandmarkTable
+)
+from engine.solver import main, solve
+
+# The searches only look for the last diamond of a board, so the boards
+# with several are left out.
+BOARDS = [
+	board for board in FIXED_BOARDS + getRandomBoards(200)
+	if sum(row.count(3) for row in board) == 1
+]
+
+class LandmarkSearchTest(unittest.TestCase):
+	""" A* and IDA* with the landmark heuristic find paths as short as plain
+	bfs.
+	"""
+	def tearDown(self):
+		clearLandmarkTableCache()
+
+	def assertShortest(self, algorithm):
+		for board in BOARDS:
+			moves = getMoves(board)
+			for multiSource in (False, True):
+				(path, found) = solve(board, algorithm, landmarks=True,
+									  multiSource=multiSource)
+				self.assertEqual(found, moves, (board, multiSource))
+				self.assertTrue(isPath(board, path), (board, path))
+
+	def testAStar(self):
+		self.assertShortest('astar')
+
+	def testIDAStar(self):
+		self.assertShortest('idastar')
+
+class TableFileTest(unittest.TestCase):
+	""" A landmark table read back from its file is the one written, and
+	only for the board it was written for.
+	"""
+	def setUp(self):
+		self.folder = tempfile.mkdtemp()
+		self.path = os.path.join(self.folder, 'input.txt.landmarks')
+
+	def tearDown(self):
+		shutil.rmtree(self.folder)
+
+	def testReadWrite(self):
+		for board in FIXED_BOARDS + getRandomBoards(20):
+			table = LandmarkTable.build(getBoard(board))
+			writeLandmarkTable(table, board, self.path)
+			read = readLandmarkTable(board, self.path)
+			self.assertEqual(read.landmarks, table.landmarks)
+			self.assertEqual(read.tables, table.tables)
+
+	def testOtherBoard(self):
+		board = FIXED_BOARDS[0]
+		writeLandmarkTable(LandmarkTable.build(getBoard(board)), board,
+						   self.path)
+		# Same size, one soldier captured, so only the crc32 differs.
+		changed = [row[:] for row in board]
+		changed[0][1] = 0
+		self.assertRaises(InvalidBoard, readLandmarkTable, changed, self.path)
+		self.assertRaises(InvalidBoard, readLandmarkTable, FIXED_BOARDS[1],
+						  self.path)
+
+	def testCutShort(self):
+		board = FIXED_BOARDS[0]
+		writeLandmarkTable(LandmarkTable.build(getBoard(board)), board,
+						   self.path)
+		with open(self.path, 'rb') as tableFile:
+			data = tableFile.read()
+		for size in (0, 10, len(data) - 4):
+			with open(self.path, 'wb') as tableFile:
+				tableFile.write(data[:size])
+			self.assertRaises(InvalidBoard, readLandmarkTable, board,
+							  self.path)
+
+class PersistedTableTest(unittest.TestCase):
+	""" The solver builds the landmark table of a board file once and reads
+	it back from the file next to the board on every later run.
+	"""
+	# The soldiers below the musketeer are a dead end, so the pruned board
+	# differs from the board read.
+	board = '1 2 2 2 3\n0 2 0 0 0\n0 2 0 0 0\n'
+
+	def setUp(self):
+		self.folder = tempfile.mkdtemp()
+		self.path = os.path.join(self.folder, 'input.txt')
+		with open(self.path, 'w') as boardFile:
+			boardFile.write(self.board)
+		self.builds = 0
+		self.build = LandmarkTable.__dict__['build']
+		build = LandmarkTable.build
+		def countBuild(board, *args):
+			self.builds += 1
+			return build(board, *args)
+		LandmarkTable.build = staticmethod(countBuild)
+
+	def tearDown(self):
+		LandmarkTable.build = self.build
+		clearLandmarkTableCache()
+		shutil.rmtree(self.folder)
+
+	def runSolver(self, *options):
+		""" Run the solver on the board file with a cold cache and return
+		what it printed.
+		"""
+		clearLandmarkTableCache()
+		stdout = sys.stdout
+		sys.stdout = StringIO.StringIO()
+		try:
+			main(['--landmarks'] + list(options) + [self.path])
+			return sys.stdout.getvalue()
+		finally:
+			sys.stdout = stdout
+
+	def assertBuiltOnce(self, *options):
+		output = self.runSolver(*options)
+		self.assertEqual(self.builds, 1)
+		self.assertEqual(self.runSolver(*options), output)
+		self.assertEqual(self.builds, 1)
+
+	def testAStar(self):
+		self.assertBuiltOnce('--algorithm', 'astar')
+
+	def testAStarPrune(self):
+		self.assertBuiltOnce('--algorithm', 'astar', '--prune')
+
+	def testIDAStarPrune(self):
+		self.assertBuiltOnce('--algorithm', 'idastar', '--prune')
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,39 @@
+""" Searching every musketeer in its own worker process, see
+engine.parallel.
+
+Run from the top folder with
+
+	python -m unittest discover tests
+
+"""
+import unittest
+
+from boards import FIXED_BOARDS, getMoves, getRandomBoards
+from engine.solver import solve
+
+class ParallelTest(unittest.TestCase):
+	""" The parallel searches return the same path as searching one
+	musketeer after another, as short as plain bfs.
+	"""
+	# Every search starts a pool of workers, so fewer boards than for the
+	# other tests.
+	boards = FIXED_BOARDS + getRandomBoards(30)
+
+	def assertSameResult(self, algorithm):
+		for board in self.boards:
+			expected = solve(board, algorithm)
+			self.assertEqual(solve(board, algorithm, parallel=True), expected,
+							 board)
+			self.assertEqual(expected[1], getMoves(board), board)
+
+	def testAStar(self):
+		self.assertSameResult('astar')
+
+	def testBfs(self):
+		self.assertSameResult('bfs')
+
+	def testIDAStar(self):
+		self.assertSameResult('idastar')
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,63 @@
+""" The command line of engine.solver on boards with nothing to find.
+
+Run from the top folder with
+
+	python -m unittest discover tests
+
+"""
+import os
+import shutil
+import StringIO
+import sys
+import tempfile
+import unittest
+
+from engine.solver import ALGORITHMS, main
+
+class NoPathTest(unittest.TestCase):
+	""" Every algorithm prints and exits the same way on a board without a
+	musketeer, without a diamond or without a path.
+	"""
+	def setUp(self):
+		self.folder = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.folder)
+
+	def runSolver(self, board, *options):
+		""" Run the solver on a board written to a file and return what it
+		printed and the message it exited with, or None.
+		"""
+		path = os.path.join(self.folder, 'input.txt')
+		with open(path, 'w') as boardFile:
+			boardFile.write(board)
+		stdout = sys.stdout
+		sys.stdout = StringIO.StringIO()
+		try:
+			main(list(options) + [path])
+			message = None
+		except SystemExit as error:
+			message = error.code
+		finally:
+			(output, sys.stdout) = (sys.stdout.getvalue(), stdout)
+		return (output, message)
+
+	def assertSolved(self, board, expected):
+		for algorithm in ALGORITHMS:
+			for options in ((), ('--multi-source',), ('--prune',)):
+				self.assertEqual(
+					self.runSolver(board, '--algorithm', algorithm, *options),
+					expected, (algorithm, options)
+				)
+
+	def testNoMusketeer(self):
+		self.assertSolved('0 2 2\n0 0 3\n', ('', 'no musketeer on the board'))
+
+	def testNoDiamond(self):
+		self.assertSolved('1 2 2\n0 0 2\n', ('', 'no diamond on the board'))
+
+	def testNoPath(self):
+		self.assertSolved('1 0 2\n0 0 3\n', ('-1\t-\n', None))
+
+if __name__ == '__main__':
+	unittest.main()